@@ -0,0 +1,127 @@
+import argparse
+import json
+import pathlib
+import re
+import subprocess
+import sys
+import time
+
+REPO_DIR = pathlib.Path(__file__).resolve().parent.parent
+
+# entry point name: (module holding its main, modules --help must not import)
+ENTRY_POINTS = {
+    "generate_metadata_reports": (
+        "src.generate_metadata_validation_report",
+        ["great_expectations", "pandas", "numpy"]),
+    "capture_metadata_locations": (
+        "src.capture_locations_from_metadata_csv",
+        ["great_expectations", "pandas"]),
+}
+# "import time: self [us] | cumulative | imported package", indented by depth
+IMPORT_TIME_LINE_REGEX = re.compile(
+    r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+def _parse_import_times(importtime_output):
+    """Return the cumulative microseconds of each module -X importtime lists.
+
+    Also returns the total over the top-level imports, which include all of
+    the imports below them.
+    """
+    module_microseconds = {}
+    total_microseconds = 0
+    for curr_line in importtime_output.splitlines():
+        curr_match = IMPORT_TIME_LINE_REGEX.match(curr_line)
+        if curr_match is None:
+            continue
+        _, cumulative, indent, module_name = curr_match.groups()
+        module_microseconds[module_name] = int(cumulative)
+        # top-level imports are indented by a single space
+        if len(indent) == 1:
+            total_microseconds += int(cumulative)
+    return module_microseconds, total_microseconds
+
+
+def check_entry_point_import_time(entry_point_name, arguments=("--help",),
+                                  env=None):
+    """Time `<entry point> --help` (or other arguments) in a fresh interpreter.
+
+    Returns the wall time, the -X importtime total, the modules imported and
+    the forbidden ones (eg, great_expectations) among them.
+    """
+    module_name, forbidden_module_names = ENTRY_POINTS[entry_point_name]
+    run_code = f"import sys; " \
+               f"sys.argv = {[entry_point_name] + list(arguments)!r}; " \
+               f"from {module_name} import main; main()"
+
+    start_time = time.perf_counter()
+    completed_run = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", run_code], cwd=REPO_DIR,
+        capture_output=True, text=True, env=env)
+    wall_seconds = time.perf_counter() - start_time
+    if completed_run.returncode != 0:
+        raise RuntimeError(f"{entry_point_name} {' '.join(arguments)} "
+                           f"failed:\n{completed_run.stderr}")
+
+    module_microseconds, total_microseconds = \
+        _parse_import_times(completed_run.stderr)
+    return {"entry_point": entry_point_name,
+            "module": module_name,
+            "wall_seconds": wall_seconds,
+            "import_seconds": total_microseconds / 10 ** 6,
+            "modules_imported": len(module_microseconds),
+            "imported_modules": sorted(module_microseconds),
+            "forbidden_imports": [x for x in forbidden_module_names
+                                  if x in module_microseconds]}
+
+
+def _parse_arguments(arg_list):
+    parser = argparse.ArgumentParser(
+        description="Check that the command line entry points start quickly: "
+                    "time `--help` of each with python -X importtime and "
+                    "fail if one imports a module it shouldn't (eg, "
+                    "great_expectations) or goes over --max-seconds.")
+    parser.add_argument("--entry-point", nargs="+", dest="entry_point_names",
+                        choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS),
+                        help="entry point(s) to check (default: all)")
+    parser.add_argument("--max-seconds", type=float, default=None,
+                        help="fail if an entry point's import total is over "
+                             "this many seconds")
+    parser.add_argument("--output", default=None,
+                        help="json file to write the timings to")
+    return parser.parse_args(arg_list)
+
+
+def main():
+    args = _parse_arguments(sys.argv[1:])
+
+    import_timings = []
+    failed = False
+    for curr_entry_point_name in args.entry_point_names:
+        curr_timing = check_entry_point_import_time(curr_entry_point_name)
+        import_timings.append(curr_timing)
+        print(f"{curr_entry_point_name}: imports took "
+              f"{curr_timing['import_seconds']:.3f}s of "
+              f"{curr_timing['wall_seconds']:.3f}s for --help "
+              f"({curr_timing['modules_imported']} modules)")
+
+        if curr_timing["forbidden_imports"]:
+            failed = True
+            print(f"  FAIL: imported "
+                  f"{', '.join(curr_timing['forbidden_imports'])}")
+        if args.max_seconds is not None and \
+                curr_timing["import_seconds"] > args.max_seconds:
+            failed = True
+            print(f"  FAIL: over the {args.max_seconds}s limit")
+
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            json.dump(import_timings, output_file, indent=2)
+        print(f"Timings written to {args.output}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+import argparse
+import json
+import pathlib
+import sys
+
+import numpy
+import pandas
+import yaml
+
+REPO_DIR = pathlib.Path(__file__).resolve().parent.parent
+GE_DIR = REPO_DIR / "great_expectations"
+FAILURE_SUITE_FP = \
+    GE_DIR / "expectations" / "inspectseq_metadata_failure_draft10.json"
+LOCATIONS_CONFIG_FP = GE_DIR / "plugins" / "expectations" / \
+    "expect_column_values_to_parse_into_expected_locations_config.yaml"
+
+SEARCH_ID_PREFIX = "SEARCH-"
+FIRST_SEARCH_ID_NUM = 10000
+MAX_VALID_SEARCH_ID_NUM = 999999
+# (first number, number of ids, zero-padded width) of each block of search
+# ids, handed out in this order: the suite accepts any 5 or 6 digits, so
+# after the usual ids come the zero-padded ones.  Past those, ids have 7 or
+# more digits and fail the id format check.
+SEARCH_ID_BLOCKS = [
+    (FIRST_SEARCH_ID_NUM, MAX_VALID_SEARCH_ID_NUM - FIRST_SEARCH_ID_NUM + 1,
+     0),
+    (0, FIRST_SEARCH_ID_NUM, 5),
+    (0, 100000, 6),
+    (MAX_VALID_SEARCH_ID_NUM + 1, None, 0)]
+# records that can have a unique, valid search id
+MAX_VALID_ID_ROWS = sum(x[1] for x in SEARCH_ID_BLOCKS[:-1])
+# most samples come from San Diego, as in the real metadata
+LOCAL_LOCATION = "North America/USA/California/San Diego"
+LOCAL_LOCATION_FRACTION = 0.7
+LOCAL_ZIP_RANGE = (91901, 92199)
+ZIP_PLUS_FOUR_FRACTION = 0.05
+DATETIME_RANGE = ("2020-03-01", "2022-12-31")
+# values are drawn from pools of pre-formatted strings, which is much faster
+# than formatting one string per row
+POOL_SIZE = 100000
+DEFAULT_CHUNK_ROWS = 1000000
+
+# values that fail (or warn on) at least one check of the shipped suites
+BAD_VALUES = {
+    "search_id": [None, "SEARCH-123", "search-12345"],
+    "source": ["bogus_source", None],
+    # all tz-aware, since a naive one would make the date checks error out
+    "sample_collection_datetime": ["2018-05-12 08:10:00+00:00",
+                                   "2021-03-03T10:00:00+00:00",
+                                   "2099-01-01 10:00:00+00:00"],
+    "sample_collection_location": ["Narnia/Cair Paravel", "USA/California",
+                                   "North America/USA/Califrnia/San Diego"],
+    "specimen_type": ["unknown", "saliva", None],
+    "subject_species": ["Dog", None],
+    "subject_gender": ["X", None],
+    "subject_age": [-6.0, 0.0, 2000.0],
+    "zip": ["9212", "19361", "92122-12", "ABCDE"],
+    "submit_to_gisaid": [None],
+    "state_code": [None, "XX"],
+}
+
+
+def _load_suite_value_sets(suite_fp):
+    with open(suite_fp) as suite_file:
+        a_suite = json.load(suite_file)
+
+    col_names = None
+    value_sets = {}
+    for curr_expectation in a_suite["expectations"]:
+        curr_type = curr_expectation["expectation_type"]
+        curr_kwargs = curr_expectation["kwargs"]
+        if curr_type == "expect_table_columns_to_match_set":
+            col_names = list(curr_kwargs["column_set"])
+        elif curr_type == "expect_column_values_to_be_in_set":
+            value_sets[curr_kwargs["column"]] = curr_kwargs["value_set"]
+    return col_names, value_sets
+
+
+def _load_leaf_locations(locations_fp):
+    with open(locations_fp) as locations_file:
+        allowed_locations = yaml.safe_load(locations_file)
+
+    leaf_locations = []
+    nodes_to_visit = [("", allowed_locations)]
+    while nodes_to_visit:
+        curr_prefix, curr_dict = nodes_to_visit.pop()
+        for curr_key, curr_value in curr_dict.items():
+            curr_path = curr_prefix + str(curr_key)
+            if isinstance(curr_value, dict) and len(curr_value) > 0:
+                nodes_to_visit.append((curr_path + "/", curr_value))
+            else:
+                leaf_locations.append(curr_path)
+    return sorted(leaf_locations)
+
+
+def _make_value_pools(rng, leaf_locations):
+    local_zips = rng.integers(*LOCAL_ZIP_RANGE, size=POOL_SIZE)
+    zip_pool = pandas.Series(local_zips).astype(str)
+    plus_four_mask = rng.random(POOL_SIZE) < ZIP_PLUS_FOUR_FRACTION
+    plus_fours = pandas.Series(
+        rng.integers(0, 10000, size=plus_four_mask.sum())).map("{:04d}".format)
+    zip_pool[plus_four_mask] = \
+        zip_pool[plus_four_mask] + "-" + plus_fours.to_numpy()
+
+    start_ns, end_ns = (pandas.Timestamp(x, tz="UTC").value
+                        for x in DATETIME_RANGE)
+    datetimes = pandas.to_datetime(
+        rng.integers(start_ns, end_ns, size=POOL_SIZE) // 10 ** 9 * 10 ** 9,
+        utc=True)
+    datetime_pool = datetimes.strftime("%Y-%m-%d %H:%M:%S+00:00")
+
+    return {"zip": zip_pool.to_numpy(dtype=object),
+            "sample_collection_datetime": numpy.array(datetime_pool,
+                                                      dtype=object),
+            "sample_collection_location": numpy.array(leaf_locations,
+                                                      dtype=object)}
+
+
+def _choose(rng, values, num_rows, p=None):
+    return rng.choice(numpy.array(values, dtype=object), size=num_rows, p=p)
+
+
+def _make_search_ids(first_row_num, num_rows):
+    row_nums = numpy.arange(first_row_num, first_row_num + num_rows)
+    search_ids = numpy.empty(num_rows, dtype=object)
+    block_start = 0
+    for first_num, block_size, width in SEARCH_ID_BLOCKS:
+        block_end = numpy.inf if block_size is None \
+            else block_start + block_size
+        in_block = (row_nums >= block_start) & (row_nums < block_end)
+        if in_block.any():
+            block_nums = row_nums[in_block] - block_start + first_num
+            search_ids[in_block] = (
+                SEARCH_ID_PREFIX +
+                pandas.Series(block_nums).astype(str).str.zfill(width)) \
+                .to_numpy(dtype=object)
+        block_start = block_end
+    return search_ids
+
+
+def _make_chunk(rng, first_row_num, num_rows, col_names, value_sets,
+                value_pools, failure_rate):
+    locations = _choose(rng, value_pools["sample_collection_location"],
+                        num_rows)
+    locations[rng.random(num_rows) < LOCAL_LOCATION_FRACTION] = LOCAL_LOCATION
+
+    col_values = {
+        "search_id": _make_search_ids(first_row_num, num_rows),
+        "source": _choose(rng, value_sets["source"], num_rows),
+        "sample_collection_datetime": _choose(
+            rng, value_pools["sample_collection_datetime"], num_rows),
+        "sample_collection_location": locations,
+        "specimen_type": _choose(rng, [x for x in value_sets["specimen_type"]
+                                       if x != "unknown"], num_rows),
+        "subject_species": _choose(rng, value_sets["subject_species"],
+                                   num_rows),
+        "subject_gender": _choose(rng, value_sets["subject_gender"], num_rows),
+        "subject_age": rng.integers(1, 96, size=num_rows).astype(float),
+        "zip": _choose(rng, value_pools["zip"], num_rows),
+        "submit_to_gisaid": _choose(rng, value_sets["submit_to_gisaid"],
+                                    num_rows),
+        "state_code": _choose(rng, ["CA"] * 9 + value_sets["state_code"],
+                              num_rows),
+        "metadata_cleared": _choose(rng, [True, False, None], num_rows,
+                                    p=[0.85, 0.05, 0.10]),
+    }
+
+    # give each failing record one bad value, in a random column
+    fail_positions = numpy.flatnonzero(rng.random(num_rows) < failure_rate)
+    fail_col_names = rng.choice(list(BAD_VALUES), size=len(fail_positions))
+    for curr_col_name in BAD_VALUES:
+        curr_positions = fail_positions[fail_col_names == curr_col_name]
+        if len(curr_positions) == 0:
+            continue
+        curr_values = col_values[curr_col_name].astype(object)
+        curr_values[curr_positions] = _choose(
+            rng, BAD_VALUES[curr_col_name], len(curr_positions))
+        col_values[curr_col_name] = curr_values
+
+    # and make some of the failing ids repeat another record's id
+    duplicate_positions = fail_positions[
+        (fail_col_names == "search_id") & (fail_positions > 0)][::2]
+    col_values["search_id"][duplicate_positions] = \
+        col_values["search_id"][duplicate_positions - 1]
+
+    return pandas.DataFrame(
+        {x: col_values[x] for x in col_names + ["metadata_cleared"]})
+
+
+def generate_synthetic_metadata(output_fp, num_rows, failure_rate=0.05,
+                                seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write a synthetic InspectSeq metadata csv of num_rows records.
+
+    Columns and allowed values come from the shipped failure suite and the
+    allowed locations yaml; about failure_rate of the records get one value
+    that fails or warns.  Written chunk_rows records at a time.  Only the
+    first MAX_VALID_ID_ROWS records get unique, valid search ids; the rest
+    fail the id format check on top of failure_rate.
+    """
+    if num_rows > MAX_VALID_ID_ROWS:
+        print(f"Note: only {MAX_VALID_ID_ROWS} records can have valid search "
+              f"ids, so the other {num_rows - MAX_VALID_ID_ROWS} fail the id "
+              f"format check")
+
+    rng = numpy.random.default_rng(seed)
+    col_names, value_sets = _load_suite_value_sets(FAILURE_SUITE_FP)
+    value_pools = _make_value_pools(
+        rng, _load_leaf_locations(LOCATIONS_CONFIG_FP))
+
+    for first_row_num in range(0, max(num_rows, 1), chunk_rows):
+        chunk_df = _make_chunk(
+            rng, first_row_num, min(chunk_rows, num_rows - first_row_num),
+            col_names, value_sets, value_pools, failure_rate)
+        chunk_df.to_csv(output_fp, index=False, mode="w" if
+                        first_row_num == 0 else "a", header=first_row_num == 0)
+
+
+def _parse_arguments(arg_list):
+    parser = argparse.ArgumentParser(
+        description="Write a synthetic InspectSeq metadata csv for "
+                    "benchmarking.")
+    parser.add_argument("output_fp", help="path of the csv to write")
+    parser.add_argument("--rows", type=int, default=100000,
+                        help="number of records (default: 100000)")
+    parser.add_argument("--failure-rate", type=float, default=0.05,
+                        help="fraction of records with a bad value "
+                             "(default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed (default: 0)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="records generated and written at a time")
+    return parser.parse_args(arg_list)
+
+
+def main():
+    args = _parse_arguments(sys.argv[1:])
+    generate_synthetic_metadata(args.output_fp, args.rows,
+                                failure_rate=args.failure_rate,
+                                seed=args.seed, chunk_rows=args.chunk_rows)
+
+
+if __name__ == '__main__':
+    main()
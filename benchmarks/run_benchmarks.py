@@ -0,0 +1,238 @@
+import argparse
+import contextlib
+import io
+import json
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy
+import pandas
+
+BENCHMARKS_DIR = pathlib.Path(__file__).resolve().parent
+REPO_DIR = BENCHMARKS_DIR.parent
+# run as a script, only this directory is on the path
+sys.path.insert(0, str(REPO_DIR))
+
+from benchmarks.generate_synthetic_metadata import LOCATIONS_CONFIG_FP, \
+    MAX_VALID_ID_ROWS, generate_synthetic_metadata  # noqa E402
+from src.metadata_loader import read_metadata_csv  # noqa E402
+from src.metadata_validation import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME, SAMPLE_DATETIME_COL_NAME, \
+    concat_fail_dfs, generate_differential_validation_df, \
+    save_report_file  # noqa E402
+from src.native_validation_engine import generate_native_result_fail_df, \
+    get_native_expectation_configs  # noqa E402
+from expectations.column_datetime_parsing import \
+    parsed_datetime_columns_cached  # noqa E402
+
+SUITE_NAMES_AND_TYPES = [(DEFAULT_FAIL_EXPECT_SUITE_NAME, "failure"),
+                         (DEFAULT_WARN_EXPECT_SUITE_NAME, "warning")]
+# share of the current report's records already in the "previous" one
+PREVIOUS_REPORT_FRACTION = 0.9
+DEFAULT_ROWS = [10000, 100000]
+
+
+def _time_call(func, *args, **kwargs):
+    start_time = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start_time
+
+
+def _summarize_seconds(seconds_list):
+    return {"seconds": min(seconds_list),
+            "median_seconds": statistics.median(seconds_list),
+            "runs": seconds_list}
+
+
+def _get_benchmark_configs(expectation_suite_name):
+    # the shipped warning suite holds a placeholder locations path
+    return [(x, {**y, "allowed_locations_abs_fp": str(LOCATIONS_CONFIG_FP)}
+             if "allowed_locations_abs_fp" in y else y)
+            for x, y in get_native_expectation_configs(expectation_suite_name)]
+
+
+def _benchmark_expectations(inspectseq_df, suites_expectation_configs,
+                            repeats):
+    expectation_timings = []
+    suites_result_fail_dfs = []
+    for (curr_suite_name, curr_suite_type), curr_configs in zip(
+            SUITE_NAMES_AND_TYPES, suites_expectation_configs):
+        curr_result_fail_dfs = []
+        for expectation_index, (curr_type, curr_kwargs) in enumerate(
+                curr_configs):
+            curr_seconds = []
+            for _ in range(repeats):
+                # the datetime cache is per run, so each repeat pays for the
+                # parse in its first date check, as a real run does
+                with parsed_datetime_columns_cached(
+                        inspectseq_df, [SAMPLE_DATETIME_COL_NAME]):
+                    curr_fail_df, curr_run_seconds = _time_call(
+                        generate_native_result_fail_df, inspectseq_df,
+                        curr_type, curr_kwargs, curr_suite_type)
+                curr_seconds.append(curr_run_seconds)
+
+            curr_result_fail_dfs.append(curr_fail_df)
+            expectation_timings.append({
+                "suite": curr_suite_name,
+                "index": expectation_index,
+                "expectation_type": curr_type,
+                "column": curr_kwargs.get("column"),
+                "failures": 0 if curr_fail_df is None else len(curr_fail_df),
+                **_summarize_seconds(curr_seconds)})
+        suites_result_fail_dfs.append(curr_result_fail_dfs)
+    return expectation_timings, suites_result_fail_dfs
+
+
+def _assemble_report(suites_result_fail_dfs):
+    # as generate_full_validation_df and the report pair do
+    return pandas.concat([concat_fail_dfs(x) for x in suites_result_fail_dfs],
+                         ignore_index=True)
+
+
+def run_benchmark(work_dir, num_rows, failure_rate=0.05, seed=0, repeats=3,
+                  report_format="csv"):
+    """Time each stage of a native-engine report run on synthetic metadata.
+
+    Stages are loading the metadata, each expectation of each suite,
+    assembling the failure frames into a report, the differential against a
+    previous report and writing the report.  Each is run repeats times.
+    """
+    metadata_fp = work_dir / f"all_samples_search_ids_synthetic_{num_rows}.csv"
+    _, generate_seconds = _time_call(
+        generate_synthetic_metadata, metadata_fp, num_rows,
+        failure_rate=failure_rate, seed=seed)
+
+    suites_expectation_configs = [_get_benchmark_configs(x)
+                                  for x, _ in SUITE_NAMES_AND_TYPES]
+    stage_seconds = {x: [] for x in
+                     ["load", "assemble", "differential", "write"]}
+
+    for _ in range(repeats):
+        inspectseq_df, curr_seconds = _time_call(
+            read_metadata_csv, str(metadata_fp), suites_expectation_configs)
+        stage_seconds["load"].append(curr_seconds)
+
+    expectation_timings, suites_result_fail_dfs = _benchmark_expectations(
+        inspectseq_df, suites_expectation_configs, repeats)
+
+    for _ in range(repeats):
+        report_df, curr_seconds = _time_call(_assemble_report,
+                                             suites_result_fail_dfs)
+        stage_seconds["assemble"].append(curr_seconds)
+
+    # the reports' own messages would only clutter the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        previous_report_fp = \
+            work_dir / f"previous_validation_report_{num_rows}.{report_format}"
+        save_report_file(
+            "", report_df.sample(frac=PREVIOUS_REPORT_FRACTION,
+                                 random_state=seed),
+            "Validation issues", previous_report_fp, save_fingerprints=True)
+        for _ in range(repeats):
+            diff_report_df, curr_seconds = _time_call(
+                generate_differential_validation_df, previous_report_fp,
+                report_df)
+            stage_seconds["differential"].append(curr_seconds)
+
+        report_fp = work_dir / f"validation_report_{num_rows}.{report_format}"
+        for _ in range(repeats):
+            _, curr_seconds = _time_call(
+                save_report_file, "", report_df, "Validation issues",
+                report_fp, save_fingerprints=True)
+            stage_seconds["write"].append(curr_seconds)
+
+    stage_timings = {x: _summarize_seconds(y)
+                     for x, y in stage_seconds.items()}
+    stage_timings["expectations"] = {"seconds": sum(
+        x["seconds"] for x in expectation_timings)}
+
+    return {"rows": num_rows,
+            "failure_rate": failure_rate,
+            # records past the valid search id space, which fail the id
+            # format check on top of failure_rate
+            "invalid_id_rows": max(num_rows - MAX_VALID_ID_ROWS, 0),
+            "seed": seed,
+            "repeats": repeats,
+            "report_format": report_format,
+            "generate_seconds": generate_seconds,
+            "metadata_bytes": metadata_fp.stat().st_size,
+            "report_records": len(report_df),
+            "differential_records": len(diff_report_df),
+            "stages": stage_timings,
+            "expectations": expectation_timings}
+
+
+def _get_git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _get_environment_info():
+    return {"timestamp": datetime.now().isoformat(),
+            "git_commit": _get_git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pandas": pandas.__version__,
+            "numpy": numpy.__version__}
+
+
+def _parse_arguments(arg_list):
+    parser = argparse.ArgumentParser(
+        description="Time the stages of a native-engine report run on "
+                    "synthetic metadata and write the timings as json.  Run "
+                    "from the repository root.")
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS,
+                        help=f"metadata sizes to benchmark, in records "
+                             f"(default: {' '.join(map(str, DEFAULT_ROWS))})")
+    parser.add_argument("--failure-rate", type=float, default=0.05,
+                        help="fraction of records with a bad value "
+                             "(default: 0.05)")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="random seed (default: 0)")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="runs of each stage; the fastest is reported "
+                             "(default: 3)")
+    parser.add_argument("--report-format", default="csv",
+                        choices=["csv", "parquet", "feather"],
+                        help="format of the reports written (default: csv)")
+    parser.add_argument("--work-dir", default=None,
+                        help="directory for the synthetic metadata and "
+                             "reports (default: a temporary directory)")
+    parser.add_argument("--output", default="benchmark_results.json",
+                        help="json file to write the timings to "
+                             "(default: benchmark_results.json)")
+    return parser.parse_args(arg_list)
+
+
+def main():
+    args = _parse_arguments(sys.argv[1:])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        work_dir = pathlib.Path(args.work_dir or temp_dir)
+        work_dir.mkdir(parents=True, exist_ok=True)
+        benchmark_results = []
+        for curr_num_rows in args.rows:
+            print(f"Benchmarking {curr_num_rows} records")
+            benchmark_results.append(run_benchmark(
+                work_dir, curr_num_rows, failure_rate=args.failure_rate,
+                seed=args.seed, repeats=args.repeats,
+                report_format=args.report_format))
+
+    with open(args.output, "w") as output_file:
+        json.dump({"environment": _get_environment_info(),
+                   "benchmarks": benchmark_results}, output_file, indent=2)
+    print(f"Timings written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+import threading
+from contextlib import contextmanager
+from datetime import timezone, datetime
+
+import numpy
+import pandas
+from dateutil.parser import parse
+
+# Stricter than the failure suite's sample_collection_datetime regex: only
+# values that are guaranteed to convert with one of the bulk formats below
+# take the vectorized path; everything else falls back to dateutil.
+BULK_DATETIME_REGEX = \
+    r"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d{1,6})?[+-]\d{2}:\d{2}$"
+WHOLE_SECONDS_FORMAT = "%Y-%m-%d %H:%M:%S%z"
+FRACTIONAL_SECONDS_FORMAT = "%Y-%m-%d %H:%M:%S.%f%z"
+
+# column name -> entries of (unique raw values, their bulk values,
+# {raw value: dateutil-parsed value} for the ones that needed the fallback).
+# Entries aren't tied to the frame they were parsed from (the metrics only
+# see the column, often of a copy or a row subset of that frame): any column
+# of the same name whose values are all among an entry's is served from it.
+_parsed_column_cache = {}
+# concurrent (thread) runs add and evict entries of the same column
+_parsed_column_cache_lock = threading.Lock()
+
+
+def get_compare_date(date_str, dates_have_tz=True):
+    try:
+        compare_date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+    except ValueError:
+        compare_date = datetime.fromisoformat(date_str)
+    if dates_have_tz and compare_date.tzinfo is None:
+        compare_date = compare_date.replace(tzinfo=timezone.utc)
+    return compare_date
+
+
+def _parse_datetime_values(column):
+    bulk_values = pandas.Series(pandas.NaT, index=column.index,
+                                dtype="datetime64[ns, UTC]")
+    try:
+        bulk_mask = column.str.match(BULK_DATETIME_REGEX)
+        fractional_mask = column.str.contains(".", regex=False)
+    except AttributeError:
+        # no string values at all, so nothing can be converted in bulk
+        bulk_mask = fractional_mask = pandas.Series(False, index=column.index)
+    bulk_mask = bulk_mask.fillna(False).to_numpy(dtype=bool)
+    fractional_mask = fractional_mask.fillna(False).to_numpy(dtype=bool)
+
+    for curr_mask, curr_format in \
+            [(bulk_mask & ~fractional_mask, WHOLE_SECONDS_FORMAT),
+             (bulk_mask & fractional_mask, FRACTIONAL_SECONDS_FORMAT)]:
+        if curr_mask.any():
+            bulk_values[curr_mask] = pandas.to_datetime(
+                column[curr_mask], format=curr_format, utc=True,
+                errors="coerce").array
+
+    # anything that did not convert in bulk (including values that matched
+    # the regex but are not real dates) gets dateutil's verdict instead
+    fallback_mask = bulk_values.isna().to_numpy()
+    fallback_values = column[fallback_mask].map(parse)
+    return bulk_values, fallback_mask, fallback_values
+
+
+def _find_cache_entry(column_name, values):
+    # the first entry for column_name holding all of values, and their
+    # positions in it
+    for cache_entry in list(_parsed_column_cache.get(column_name, [])):
+        positions = cache_entry[0].get_indexer(values)
+        if not (positions < 0).any():
+            return cache_entry, positions
+    return None, None
+
+
+def _parse_from_cache(column):
+    cache_entry, positions = _find_cache_entry(column.name, column)
+    if cache_entry is None:
+        return None
+
+    _, unique_bulk_values, fallback_lookup = cache_entry
+    bulk_values = pandas.Series(unique_bulk_values.take(positions),
+                                index=column.index)
+    fallback_mask = bulk_values.isna().to_numpy()
+    fallback_values = column[fallback_mask].map(fallback_lookup)
+    return bulk_values, fallback_mask, fallback_values
+
+
+def parse_datetime_column(column):
+    """Parse a column of datetime strings.
+
+    Returns a tuple of (bulk_values, fallback_mask, fallback_values):
+    bulk_values is a tz-aware UTC datetime64 series holding every value that
+    could be converted in bulk (NaT elsewhere), fallback_mask flags the
+    remaining rows, and fallback_values holds those rows parsed one at a
+    time with dateutil, exactly as column.map(parse) would.
+
+    If every value of the column is among those of a column of the same
+    name registered with cache_parsed_datetime_columns (eg, it is that
+    column, or a row subset of it), the cached parse is reused.
+    """
+    parsed = _parse_from_cache(column)
+    if parsed is None:
+        parsed = _parse_datetime_values(column)
+    return parsed
+
+
+def cache_parsed_datetime_columns(a_dataframe, column_names):
+    """Parse each named column of a_dataframe once for reuse by later metrics.
+
+    Only the distinct values are parsed, and not at all if they are already
+    cached (eg, the frame is a row subset of one registered earlier).
+    Columns whose values can't all be parsed are not cached, so that the
+    metric itself raises as usual.  Returns the cache entries added by this
+    call, as (column name, entry) pairs.
+    """
+    added_cache_entries = []
+    for curr_column_name in column_names:
+        if curr_column_name not in a_dataframe.columns:
+            continue
+
+        unique_values = pandas.Series(
+            a_dataframe[curr_column_name].dropna().unique(),
+            name=curr_column_name)
+        if _find_cache_entry(curr_column_name, unique_values)[0] is not None:
+            continue
+
+        try:
+            bulk_values, fallback_mask, fallback_values = \
+                _parse_datetime_values(unique_values)
+        except (ValueError, TypeError, OverflowError) as ex:
+            print(f"Not caching parsed {curr_column_name} values: {ex}")
+            continue
+
+        fallback_lookup = dict(zip(unique_values[fallback_mask],
+                                   fallback_values))
+        cache_entry = (pandas.Index(unique_values), bulk_values.array,
+                       fallback_lookup)
+        with _parsed_column_cache_lock:
+            _parsed_column_cache.setdefault(curr_column_name, []).append(
+                cache_entry)
+        added_cache_entries.append((curr_column_name, cache_entry))
+
+    return added_cache_entries
+
+
+@contextmanager
+def parsed_datetime_columns_cached(a_dataframe, column_names):
+    """Cache parsed datetime columns of a_dataframe for the enclosed run.
+
+    Only entries added here are evicted afterwards, so nested or concurrent
+    runs on the same frame don't evict each other's cache.
+    """
+    added_cache_entries = cache_parsed_datetime_columns(a_dataframe,
+                                                        column_names)
+    try:
+        yield
+    finally:
+        with _parsed_column_cache_lock:
+            for curr_column_name, cache_entry in added_cache_entries:
+                _parsed_column_cache[curr_column_name] = [
+                    x for x in _parsed_column_cache[curr_column_name]
+                    if x is not cache_entry]
+
+
+def compare_datetime_column(column, compare_date, compare_func):
+    """Apply compare_func(parsed_value, compare_date) to every value.
+
+    Produces the same per-row results as
+    compare_func(column.map(parse), compare_date).
+    """
+    if compare_date.tzinfo is None:
+        # bulk values are always tz-aware, and comparing them to a naive
+        # date must fail the same way the per-value comparison does
+        return compare_func(column.map(parse), compare_date)
+
+    bulk_values, fallback_mask, fallback_values = \
+        parse_datetime_column(column)
+    results = compare_func(bulk_values, pandas.Timestamp(compare_date))
+    results = results.to_numpy(dtype=bool, copy=True)
+    if fallback_mask.any():
+        results[fallback_mask] = numpy.asarray(
+            compare_func(fallback_values, compare_date), dtype=bool)
+    return pandas.Series(results, index=column.index)
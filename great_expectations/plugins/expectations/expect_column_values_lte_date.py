@@ -1,5 +1,4 @@
-from datetime import timezone, datetime
-from dateutil.parser import parse
+import operator
 
 from great_expectations.render.types import RenderedTableContent, RenderedBulletListContent, RenderedGraphContent
 
@@ -31,6 +30,11 @@ from great_expectations.render.util import (
 )
 from great_expectations.validator.metric_configuration import MetricConfiguration
 
+from expectations.column_datetime_parsing import (
+    compare_datetime_column,
+    get_compare_date,
+)
+
 # This class defines a Metric to support your Expectation.
 # For most ColumnMapExpectations, the main business logic for calculation will live in this class.
 class ColumnValuesLteDate(ColumnMapMetricProvider):
@@ -47,18 +51,8 @@ class ColumnValuesLteDate(ColumnMapMetricProvider):
         dates_have_tz=True,
         **kwargs
     ):
-        # def map_func(str_date):
-        #     return datetime.strptime(max_value, "%Y-%m-%d %H:%M:%S.%f %z")
-
-        #compare_date = parse(max_value)
-        try:
-            compare_date = datetime.strptime(max_value, "%Y-%m-%d %H:%M:%S")
-        except ValueError as ex:
-            compare_date = datetime.fromisoformat(max_value)
-        if dates_have_tz and compare_date.tzinfo is None:
-            compare_date = compare_date.replace(tzinfo=timezone.utc)
-        temp_column = column.map(parse)
-        return temp_column <= compare_date
+        compare_date = get_compare_date(max_value, dates_have_tz)
+        return compare_datetime_column(column, compare_date, operator.le)
 
     @classmethod
     def _get_evaluation_dependencies(
@@ -1,5 +1,4 @@
 import json
-import yaml
 from great_expectations.render.types import RenderedTableContent, RenderedBulletListContent, RenderedGraphContent
 
 from typing import Any, Callable, Dict, List, Optional, Union
@@ -38,21 +37,11 @@ from great_expectations.render.util import (
 )
 from great_expectations.validator.metric_configuration import MetricConfiguration
 
-
-def _test_cell_value(cell_value, allowed_locations):
-    delimiter = "/"
-    if type(cell_value) == str:
-        cell_value = cell_value.rstrip(delimiter)
-        # split each column value on /
-        pieces = cell_value.split(delimiter)
-        curr_dict = allowed_locations
-
-        for curr_piece in pieces:
-            curr_dict = curr_dict.get(curr_piece, None)
-            if curr_dict is None:
-                return False
-
-    return True
+from expectations.location_matching import (
+    compile_allowed_locations,
+    load_allowed_locations,
+    match_locations,
+)
 
 
 # This class defines a Metric to support your Expectation.
@@ -61,23 +50,23 @@ class ColumnValuesParseIntoExpectedLocations(ColumnMapMetricProvider):
 
     # This is the id string that will be used to reference your metric.
     condition_metric_name = "column_values.parse_into_expected_locations"
-    allowed_locations = None
 
     @classmethod
     def _load_allowed_location(cls, allowed_locations_abs_fp):
-        locations_dict = allowed_locations_abs_fp
-        if not type(allowed_locations_abs_fp) == dict:
-            with open(allowed_locations_abs_fp, 'r') as file:
-                locations_dict = yaml.load(file, Loader=yaml.FullLoader)
-        cls.allowed_locations = locations_dict
+        # returned rather than kept on the class, which concurrent suites
+        # share; only the (locked) cache in location_matching is shared
+        if type(allowed_locations_abs_fp) == dict:
+            locations_dict = allowed_locations_abs_fp
+            return locations_dict, compile_allowed_locations(locations_dict)
+        return load_allowed_locations(allowed_locations_abs_fp)
 
     condition_value_keys = ("allowed_locations_abs_fp",)
 
     # This method implements the core logic for the PandasExecutionEngine
     @column_condition_partial(engine=PandasExecutionEngine)
     def _pandas(cls, column, allowed_locations_abs_fp, **kwargs):
-        cls._load_allowed_location(allowed_locations_abs_fp)
-        return column.apply(_test_cell_value, args=(cls.allowed_locations,))
+        _, allowed_paths = cls._load_allowed_location(allowed_locations_abs_fp)
+        return match_locations(column, allowed_paths)
 
     @classmethod
     def _get_evaluation_dependencies(
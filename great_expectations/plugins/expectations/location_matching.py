@@ -0,0 +1,106 @@
+import os
+import threading
+
+import numpy
+import pandas
+import yaml
+
+try:
+    # the libyaml-backed loader is much faster, when it is available
+    from yaml import CFullLoader as LocationsYamlLoader
+except ImportError:
+    from yaml import FullLoader as LocationsYamlLoader
+
+LOCATION_DELIMITER = "/"
+
+# (absolute path, mtime in ns, size) -> (locations dict, compiled paths)
+_allowed_locations_cache = {}
+_allowed_locations_cache_info = {"hits": 0, "misses": 0}
+# guards the cache and its counts, which --concurrent-suites thread updates
+# from several threads
+_allowed_locations_lock = threading.Lock()
+
+
+def compile_allowed_locations(allowed_locations):
+    """Flatten a nested dict of allowed locations into a set of valid paths.
+
+    Every node of the hierarchy contributes its full delimited path, so a
+    location is allowed exactly when its path (without trailing delimiters)
+    is in the set--the same outcome as walking the nested dicts piece by
+    piece.  Keys that are not strings (eg, yaml booleans), that contain the
+    delimiter, or whose value is None can never be matched by such a walk,
+    so they are left out.
+    """
+    allowed_paths = set()
+    nodes_to_visit = [("", allowed_locations)]
+    while nodes_to_visit:
+        curr_prefix, curr_dict = nodes_to_visit.pop()
+        for curr_key, curr_value in curr_dict.items():
+            if not type(curr_key) == str or curr_value is None or \
+                    LOCATION_DELIMITER in curr_key:
+                continue
+
+            curr_path = curr_prefix + curr_key
+            allowed_paths.add(curr_path)
+            if type(curr_value) == dict:
+                nodes_to_visit.append(
+                    (curr_path + LOCATION_DELIMITER, curr_value))
+
+    return frozenset(allowed_paths)
+
+
+def _test_cell_value(cell_value, allowed_paths):
+    if type(cell_value) == str:
+        return cell_value.rstrip(LOCATION_DELIMITER) in allowed_paths
+
+    return True
+
+
+def match_locations(column, allowed_paths):
+    # locations repeat heavily, so test each distinct value once and
+    # broadcast the outcomes back to the rows
+    codes, unique_values = pandas.factorize(column)
+    unique_results = numpy.fromiter(
+        (_test_cell_value(x, allowed_paths) for x in unique_values),
+        dtype=bool, count=len(unique_values))
+    # factorize codes nulls as -1, which picks up this trailing True
+    unique_results = numpy.append(unique_results, True)
+    return pandas.Series(unique_results.take(codes), index=column.index)
+
+
+def load_allowed_locations(allowed_locations_abs_fp):
+    """Return (locations dict, compiled paths) for an allowed-locations yaml.
+
+    Parsed files are cached for the life of the process; the cache key
+    includes the file's modification time and size, so edits to the yaml are
+    picked up by the next call.
+    """
+    abs_fp = os.path.abspath(allowed_locations_abs_fp)
+    file_stat = os.stat(abs_fp)
+    cache_key = (abs_fp, file_stat.st_mtime_ns, file_stat.st_size)
+
+    # held while parsing, too, so that threads wanting the same file wait
+    # for one parse rather than each doing their own
+    with _allowed_locations_lock:
+        cached_locations = _allowed_locations_cache.get(cache_key)
+        if cached_locations is not None:
+            _allowed_locations_cache_info["hits"] += 1
+            return cached_locations
+
+        _allowed_locations_cache_info["misses"] += 1
+        with open(abs_fp, 'r') as file:
+            locations_dict = yaml.load(file, Loader=LocationsYamlLoader)
+
+        # drop stale versions of the same file
+        for curr_key in [x for x in _allowed_locations_cache
+                         if x[0] == abs_fp]:
+            _allowed_locations_cache.pop(curr_key)
+        _allowed_locations_cache[cache_key] = \
+            (locations_dict, compile_allowed_locations(locations_dict))
+        return _allowed_locations_cache[cache_key]
+
+
+def get_allowed_locations_cache_info():
+    with _allowed_locations_lock:
+        return dict(_allowed_locations_cache_info,
+                    entries=len(_allowed_locations_cache))
@@ -16,6 +16,7 @@ setup(
     entry_points={
         'console_scripts': [
             'capture_metadata_locations=src.capture_locations_from_metadata_csv:main',
-            'generate_metadata_reports=src.generate_metadata_validation_report:main'
+            'generate_metadata_reports=src.generate_metadata_validation_report:main',
+            'serve_metadata_reports=src.validation_service:main'
         ]}
 )
@@ -1,68 +1,125 @@
-import pandas
+import argparse
+import csv
+import os
+
 import yaml
 from sys import argv
 
+LOCATION_COL_NAME = "sample_collection_location"
+LOCATION_DELIMITER = "/"
+# continent/country/state/county
+MAX_LOCATION_DEPTH = 4
+# the strings pandas.read_csv reads as nulls by default, so the locations
+# captured are those the validator sees
+NULL_LOCATION_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a",
+    "nan", "null"])
+
+
+def insert_location(known_values, location, max_depth=MAX_LOCATION_DEPTH):
+    """Add a delimited location to a nested dict of known locations.
+
+    Each piece of the location (stripped of whitespace) becomes a key one
+    level down from the previous one; empty pieces are skipped.  Values that
+    aren't strings (eg, nulls) are ignored.  A key with no value (as a yaml
+    leaf written `Key:` loads) is given an empty dict before descending.
+    """
+    if not type(location) == str:
+        return
+
+    pieces = location.split(LOCATION_DELIMITER)
+    if len(pieces) > max_depth:
+        raise ValueError(f"Location is longer than expected: {location}")
+
+    curr_dict = known_values
+    for curr_piece in pieces:
+        if curr_piece:
+            curr_key = curr_piece.strip()
+            if curr_dict.get(curr_key) is None:
+                curr_dict[curr_key] = {}
+            curr_dict = curr_dict[curr_key]
+
+
+def build_locations_tree(locations, known_values=None):
+    """Return a nested dict of the given locations (added to known_values)."""
+    if known_values is None:
+        known_values = {}
+    for curr_location in locations:
+        insert_location(known_values, curr_location)
+    return known_values
+
 
 def collect_unique_locations(test_metadata):
-    value_set = list(test_metadata.sample_collection_location.unique())
+    return build_locations_tree(
+        test_metadata[LOCATION_COL_NAME].unique())
 
-    known_values = {}
-    for i in value_set:
-        print(i)
-        if not type(i) == str:
-            continue
-
-        pieces = i.split("/")
-        if len(pieces) < 1:
-            raise ValueError("No location info")
-        elif len(pieces) > 4:
-            raise ValueError(f"Location is longer than expected: {i}")
-
-        curr_dict = known_values
-        piece_0 = piece_1 = piece_2 = None
-        for piece_index in range(len(pieces)):
-            curr_piece = pieces[piece_index]
-            if curr_piece:
-                if piece_index == 0:
-                    piece_0 = curr_piece.strip()
-                    if piece_0 not in curr_dict:
-                        known_values[piece_0] = {}
-                    curr_dict = known_values[piece_0]
-                elif piece_index == 1:
-                    piece_1 = curr_piece.strip()
-                    if piece_1 not in curr_dict:
-                        known_values[piece_0][piece_1] = {}
-                    curr_dict = known_values[piece_0][piece_1]
-                elif piece_index == 2:
-                    piece_2 = curr_piece.strip()
-                    if piece_2 not in curr_dict:
-                        known_values[piece_0][piece_1][piece_2] = {}
-                    curr_dict = known_values[piece_0][piece_1][piece_2]
-                elif piece_index == 3:
-                    piece_3 = curr_piece.strip()
-                    if curr_piece not in curr_dict:
-                        known_values[piece_0][piece_1][piece_2][piece_3] = {}
-                else:
-                    raise ValueError("piece_index > 3")
 
-    return known_values
+def read_unique_locations(input_fps):
+    """Return the set of distinct locations in one or more metadata csvs.
+
+    The files are streamed a row at a time with the csv module, keeping only
+    the location column, so memory depends on the number of distinct
+    locations rather than on file sizes (and pandas is never imported).
+    """
+    unique_locations = set()
+    for curr_input_fp in input_fps:
+        with open(curr_input_fp, newline="", encoding="utf-8-sig") as \
+                csv_file:
+            csv_reader = csv.reader(csv_file)
+            header = next(csv_reader, [])
+            try:
+                location_index = header.index(LOCATION_COL_NAME)
+            except ValueError:
+                raise ValueError(f"No {LOCATION_COL_NAME} column in "
+                                 f"{curr_input_fp}") from None
 
+            for curr_row in csv_reader:
+                if len(curr_row) > location_index:
+                    unique_locations.add(curr_row[location_index])
 
-def generate_unique_locations_yaml(input_fp, output_fp):
-    test_metadata = pandas.read_csv(input_fp)
+    return unique_locations - NULL_LOCATION_VALUES
 
-    known_values = collect_unique_locations(test_metadata)
+
+def generate_unique_locations_yaml(input_fps, output_fp, base_yaml_fp=None):
+    if isinstance(input_fps, (str, os.PathLike)):
+        input_fps = [input_fps]
+
+    known_values = {}
+    if base_yaml_fp is not None:
+        with open(base_yaml_fp) as base_yamlfile:
+            known_values = yaml.safe_load(base_yamlfile) or {}
+
+    unique_locations = read_unique_locations(input_fps)
+    print(f"Found {len(unique_locations)} distinct locations in "
+          f"{len(input_fps)} metadata file(s)")
+    build_locations_tree(sorted(unique_locations), known_values)
 
     with open(output_fp, 'w') as yamlfile:
         yaml.dump(known_values, yamlfile)
         print("Locations yaml write successful")
 
 
+def _parse_arguments(arg_list):
+    parser = argparse.ArgumentParser(
+        prog="capture_metadata_locations",
+        description="Capture the sample collection locations used in one or "
+                    "more InspectSeq metadata csv files into a yaml file.")
+    parser.add_argument("input_fps", nargs="+",
+                        help="path(s) to the all_samples_search_ids_*.csv "
+                             "file(s)")
+    parser.add_argument("output_fp", help="path of the yaml file to write")
+    parser.add_argument("--merge", dest="base_yaml_fp", default=None,
+                        help="an existing locations yaml file whose locations "
+                             "are kept, with the captured ones added")
+    return parser.parse_args(arg_list[1:])
+
+
 def main():
-    input_fp = argv[1]
-    output_fp = argv[2]
+    args = _parse_arguments(argv)
 
-    generate_unique_locations_yaml(input_fp, output_fp)
+    generate_unique_locations_yaml(args.input_fps, args.output_fp,
+                                   args.base_yaml_fp)
 
 
 if __name__ == '__main__':
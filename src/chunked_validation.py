@@ -0,0 +1,235 @@
+import itertools
+
+import numpy
+import pandas
+
+from src.metadata_loader import read_metadata_csv_chunks
+from src.metadata_validation import DATASOURCE_NAME, \
+    DIFF_REPORT_FNAME_ROOT, FAIL_CHECK_COL_NAME, FAIL_COL_NAME, \
+    FAIL_SOURCE_COL_NAME, FAIL_TYPE_COL_NAME, FAIL_VAL_COL_NAME, \
+    FRAME_LEVEL_EXPECTATION_TYPES, FULL_REPORT_FNAME_ROOT, METADATA_CLEARED, \
+    NOT_BAD_KIND, SAMPLE_DATETIME_COL_NAME, SEARCH_ID_COL_NAME, \
+    TABLE_LEVEL_EXPECTATION_TYPES, UNIQUE_EXPECTATION_TYPE, \
+    build_validation_fail_df, concat_fail_dfs, fingerprint_report_records, \
+    get_latest_validation_report, get_suite_expectation_configs, \
+    load_report_fingerprints, record_report_in_manifest, \
+    save_report_fingerprints, select_new_records, suite_supports_projection, \
+    validate_expectation_subset
+
+
+class _DuplicateTracker:
+    """Finds duplicated non-null values of a column across streamed chunks.
+
+    Holds one entry per distinct value seen, plus the repeat occurrences,
+    rather than the chunks themselves.
+    """
+
+    def __init__(self, column_name):
+        self.column_name = column_name
+        self._num_rows = 0
+        # value -> (row position, search_id) of its first occurrence
+        self._first_occurrences = {}
+        # (row position, search_id, value) of every later occurrence
+        self._repeat_occurrences = []
+
+    def update(self, chunk_df):
+        start_position = self._num_rows
+        self._num_rows += len(chunk_df)
+
+        values = chunk_df[self.column_name]
+        not_null_mask = values.notna().to_numpy()
+        positions = range(start_position, self._num_rows)
+        for curr_position, curr_value, curr_search_id, curr_not_null in zip(
+                positions, values, chunk_df[SEARCH_ID_COL_NAME],
+                not_null_mask):
+            if not curr_not_null:
+                continue
+
+            if curr_value in self._first_occurrences:
+                self._repeat_occurrences.append(
+                    (curr_position, curr_search_id, curr_value))
+            else:
+                self._first_occurrences[curr_value] = \
+                    (curr_position, curr_search_id)
+
+    def generate_fail_df(self, expectation_suite_type):
+        # like the uniqueness metric, every occurrence of a duplicated value
+        # fails, including the first, in row order
+        duplicate_occurrences = list(self._repeat_occurrences)
+        for curr_value in {x[2] for x in self._repeat_occurrences}:
+            curr_position, curr_search_id = \
+                self._first_occurrences[curr_value]
+            duplicate_occurrences.append(
+                (curr_position, curr_search_id, curr_value))
+        if len(duplicate_occurrences) == 0:
+            return None
+
+        duplicate_occurrences.sort(key=lambda x: x[0])
+        return pandas.DataFrame({
+            FAIL_SOURCE_COL_NAME: [x[1] for x in duplicate_occurrences],
+            FAIL_COL_NAME: self.column_name,
+            FAIL_VAL_COL_NAME: [str(x[2]) for x in duplicate_occurrences],
+            FAIL_CHECK_COL_NAME: UNIQUE_EXPECTATION_TYPE,
+            FAIL_TYPE_COL_NAME: expectation_suite_type})
+
+
+def _append_report_rows(report_df, output_path, written_paths):
+    if report_df is None or len(report_df) == 0:
+        return
+
+    report_df.to_csv(output_path.absolute(), index=False,
+                     mode="a" if output_path in written_paths else "w",
+                     header=output_path not in written_paths)
+    written_paths.add(output_path)
+
+
+def _finish_report_file(df_kind, report_type, output_path, written_paths):
+    if output_path in written_paths:
+        print(f"{report_type} {df_kind} detected and report saved")
+    else:
+        # create an empty file as a sentinel
+        output_path.touch()
+        print(f"No {report_type} {df_kind} detected")
+
+
+def generate_chunked_reports(context, inspectseq_csv_path,
+                             suite_names_and_types, chunksize,
+                             get_report_path, get_run_name):
+    """Validate a metadata csv in row chunks and stream out its reports.
+
+    Row-local expectations run on each chunk and their fail rows are
+    appended to the reports as soon as the chunk is done.  The table-level
+    column checks only need the header, and the uniqueness checks keep a
+    running record of the values seen so far; their rows are written first
+    and last, respectively.  Peak memory is bounded by the chunk size plus
+    that running record, not by the file size.
+    """
+    from expectations.column_datetime_parsing import \
+        parsed_datetime_columns_cached
+
+    suites_expectation_configs = [
+        get_suite_expectation_configs(context, x)
+        for x, _ in suite_names_and_types]
+    for (curr_suite_name, _), curr_configs in zip(
+            suite_names_and_types, suites_expectation_configs):
+        if not suite_supports_projection(curr_configs):
+            raise ValueError(f"Suite {curr_suite_name} uses 'mostly' "
+                             f"thresholds, which can't be evaluated chunk "
+                             f"by chunk")
+
+    inspectseq_path_str = str(inspectseq_csv_path.absolute())
+    df_kinds = ["", NOT_BAD_KIND]
+
+    # Important: find (and load) the previous reports BEFORE writing any of
+    # this run's reports!
+    latest_report_fingerprints = {}
+    for curr_df_kind in df_kinds:
+        latest_report_fp = get_latest_validation_report(
+            inspectseq_csv_path.parent, curr_df_kind)
+        if latest_report_fp is None:
+            print(f"No previous {curr_df_kind} validation report available "
+                  f"so no differential report created")
+        else:
+            latest_report_fingerprints[curr_df_kind] = \
+                load_report_fingerprints(latest_report_fp)
+
+    full_report_paths = {x: get_report_path(FULL_REPORT_FNAME_ROOT, x)
+                         for x in df_kinds}
+    diff_report_paths = {x: get_report_path(DIFF_REPORT_FNAME_ROOT, x)
+                         for x in latest_report_fingerprints}
+    written_paths = set()
+    full_report_fingerprints = {x: [] for x in df_kinds}
+
+    def _write_report_rows(df_kind, report_df):
+        if report_df is None:
+            return
+
+        _append_report_rows(report_df, full_report_paths[df_kind],
+                            written_paths)
+        full_report_fingerprints[df_kind].append(
+            fingerprint_report_records(report_df))
+        if df_kind in latest_report_fingerprints:
+            _append_report_rows(
+                select_new_records(latest_report_fingerprints[df_kind],
+                                   report_df),
+                diff_report_paths[df_kind], written_paths)
+
+    # every chunk (even of a file with no rows) has the columns and dtypes of
+    # the whole file read at once, so the first tells the column checks the
+    # header, the same for both kinds of report
+    chunk_reader = read_metadata_csv_chunks(
+        inspectseq_path_str, suites_expectation_configs, chunksize)
+    first_chunk_df = next(chunk_reader)
+    header_df = first_chunk_df.iloc[:0]
+    header_fail_df = concat_fail_dfs([
+        build_validation_fail_df(
+            header_df,
+            validate_expectation_subset(
+                context, DATASOURCE_NAME, curr_suite_name,
+                get_run_name("header"), header_df,
+                lambda x: x in TABLE_LEVEL_EXPECTATION_TYPES),
+            curr_suite_type)
+        for curr_suite_name, curr_suite_type in suite_names_and_types])
+    for curr_df_kind in df_kinds:
+        _write_report_rows(curr_df_kind, header_fail_df)
+
+    duplicate_trackers = {x: [] for x in df_kinds}
+    for curr_suite_name, curr_suite_type in suite_names_and_types:
+        for curr_expectation in context.get_expectation_suite(
+                curr_suite_name).expectations:
+            if curr_expectation.expectation_type == UNIQUE_EXPECTATION_TYPE:
+                for curr_df_kind in df_kinds:
+                    duplicate_trackers[curr_df_kind].append(
+                        (_DuplicateTracker(
+                            curr_expectation.kwargs["column"]),
+                         curr_suite_type))
+
+    for chunk_index, chunk_df in enumerate(
+            itertools.chain([first_chunk_df], chunk_reader)):
+        # unexpected indices are resolved positionally, so each chunk
+        # needs its own zero-based index
+        chunk_df.reset_index(inplace=True, drop=True)
+        known_bad = chunk_df[METADATA_CLEARED] == False  # noqa 712
+        # a nullable boolean column compares NA to False as NA
+        known_bad = known_bad.fillna(False).astype(bool)
+        not_known_bad_df = chunk_df[~known_bad]
+
+        with parsed_datetime_columns_cached(chunk_df,
+                                            [SAMPLE_DATETIME_COL_NAME]):
+            chunk_fail_df = concat_fail_dfs([
+                build_validation_fail_df(
+                    chunk_df,
+                    validate_expectation_subset(
+                        context, DATASOURCE_NAME, curr_suite_name,
+                        get_run_name(f"chunk{chunk_index}"), chunk_df,
+                        lambda x: x not in FRAME_LEVEL_EXPECTATION_TYPES),
+                    curr_suite_type)
+                for curr_suite_name, curr_suite_type in
+                suite_names_and_types])
+
+        _write_report_rows("", chunk_fail_df)
+        if chunk_fail_df is not None:
+            _write_report_rows(NOT_BAD_KIND, chunk_fail_df[
+                chunk_fail_df.index.isin(not_known_bad_df.index)])
+
+        for curr_tracker, _ in duplicate_trackers[""]:
+            curr_tracker.update(chunk_df)
+        for curr_tracker, _ in duplicate_trackers[NOT_BAD_KIND]:
+            curr_tracker.update(not_known_bad_df)
+
+    for curr_df_kind in df_kinds:
+        for curr_tracker, curr_suite_type in duplicate_trackers[curr_df_kind]:
+            _write_report_rows(
+                curr_df_kind, curr_tracker.generate_fail_df(curr_suite_type))
+
+        if curr_df_kind in diff_report_paths:
+            _finish_report_file(
+                curr_df_kind, "Differential validation issues",
+                diff_report_paths[curr_df_kind], written_paths)
+        _finish_report_file(curr_df_kind, "Validation issues",
+                            full_report_paths[curr_df_kind], written_paths)
+        save_report_fingerprints(
+            numpy.concatenate([numpy.empty(0, dtype="<u8")] +
+                              full_report_fingerprints[curr_df_kind]),
+            full_report_paths[curr_df_kind])
+        record_report_in_manifest(full_report_paths[curr_df_kind])
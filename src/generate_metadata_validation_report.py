@@ -1,235 +1,383 @@
+import argparse
+import functools
+import glob
+import importlib.util
 import pathlib
-import pandas
-import great_expectations as ge
+import re
 from sys import argv
 from datetime import datetime
 
-DEFAULT_FAIL_EXPECT_SUITE_NAME = "inspectseq_metadata_failure_draft10"
-DEFAULT_WARN_EXPECT_SUITE_NAME = "inspectseq_metadata_warning_draft5"
-DATASOURCE_NAME = "inspectseq_metadata"
-METADATA_CLEARED = "metadata_cleared"
-NOT_BAD_KIND = "not_known_bad"
-FULL_REPORT_FNAME_ROOT = "_validation_report_"
-
-# NB: ensure DIFF_REPORT_FNAME_ROOT is not substring of FULL_REPORT_FNAME_ROOT
-DIFF_REPORT_FNAME_ROOT = "_validation_differential_report_"
-SEARCH_ID_COL_NAME = "search_id"
-FAIL_SOURCE_COL_NAME = "fail_source"
-FAIL_COL_NAME = "fail_column"
-FAIL_VAL_COL_NAME = "fail_value"
-FAIL_CHECK_COL_NAME = "fail_check"
-FAIL_TYPE_COL_NAME = "fail_type"
-
-
-def _validate_datacontext(context, datasource_name, expectation_suite_name,
-                          default_data_name, inspectseq_df):
-    batch_request = {
-        "datasource_name": datasource_name,
-        "data_connector_name": "default_runtime_data_connector_name",
-        "data_asset_name": default_data_name
-    }
-
-    checkpoint_config = {
-        "name": "input_df_checkpoint",
-        "class_name": "SimpleCheckpoint",
-        "validations": [
-            {
-                "batch_request": batch_request,
-                "expectation_suite_name": expectation_suite_name
-            }
-        ],
-        "runtime_configuration": {
-            "result_format": {
-                "result_format": "COMPLETE",
-                "include_unexpected_rows": True,
-            }
-        }
-    }
-
-    context.add_checkpoint(**checkpoint_config)
-
-    # switched over to passing in a dataframe rather than letting great
-    # expectations load the csv into a dataframe behind the scenes in order
-    # to prevent GE/pandas from automagically converting zip codes to floating-
-    # point numbers--sheesh.
-    checkpoint_result = context.run_checkpoint(
-        checkpoint_name="input_df_checkpoint",
-        batch_request={
-            "runtime_parameters": {"batch_data": inspectseq_df},
-            "batch_identifiers": {
-                "default_identifier_name": default_data_name
-            },
-        },
-    )
-
-    return checkpoint_result
-
-
-def _generate_validation_fail_df(context, datasource_name, checkpoint_result,
-                                 expectation_suite_type):
-    a_dataframe = context.datasources[
-        datasource_name].execution_engine.active_batch_data.dataframe
-    search_id_col_idx = a_dataframe.columns.get_loc(SEARCH_ID_COL_NAME)
-
-    validation_result_id = \
-        checkpoint_result.list_validation_result_identifiers()[0]
-    results = checkpoint_result.run_results[
-        validation_result_id]["validation_result"].results
-
-    fail_df = None
-    for curr_result in results:
-        if not curr_result.success:
-            if curr_result.exception_info and \
-                    curr_result.exception_info['raised_exception']:
-                print(f"Validation failed: {curr_result.exception_info}")
-                continue
-
-            fail_type = curr_result.expectation_config.expectation_type
-            if 'unexpected_index_list' in curr_result.result:
-                fail_column = curr_result.expectation_config.kwargs["column"]
-                fail_indices = curr_result.result['unexpected_index_list']
-                fail_values = curr_result.result["unexpected_list"]
-                fail_cols = [fail_column for i in range(len(fail_values))]
-                curr_fail_df = a_dataframe.iloc[fail_indices,
-                                                [search_id_col_idx]].copy()
-                curr_fail_df.rename(
-                    columns={SEARCH_ID_COL_NAME: FAIL_SOURCE_COL_NAME},
-                    inplace=True)
-            elif "details" in curr_result.result and "mismatched" in \
-                    curr_result.result["details"]:
-                fail_info = curr_result.result["details"]["mismatched"]
-                fail_key = "missing" if "missing" in fail_info \
-                    else "unexpected"
-                fail_cols = fail_info[fail_key]
-                fail_values = [fail_key for i in range(len(fail_cols))]
-                curr_fail_df = pandas.DataFrame(
-                    {FAIL_SOURCE_COL_NAME: ["column" for i in
-                                            range(len(fail_values))]})
-            else:
-                raise ValueError(f"unrecognized outputs for expectation "
-                                 f"{fail_type}")
-
-            curr_fail_df[FAIL_COL_NAME] = fail_cols
-            # force the fail values to be recorded as strings, since otherwise
-            # if they are all numbers, pandas coerces them to numeric, which
-            # then makes for issues comparing to any previous failure report
-            # where NOT all the fail values were numeric and thus the column
-            # was stored as a string :-|
-            curr_fail_df[FAIL_VAL_COL_NAME] = [str(i) for i in fail_values]
-            curr_fail_df[FAIL_CHECK_COL_NAME] = [fail_type for i in
-                                                 range(len(fail_values))]
-            curr_fail_df[FAIL_TYPE_COL_NAME] = [expectation_suite_type for
-                                                i in range(len(fail_values))]
-
-            if fail_df is None:
-                fail_df = curr_fail_df.copy()
-            else:
-                fail_df = pandas.concat([fail_df, curr_fail_df])
-
-    return fail_df
-
-
-def generate_full_validation_df(context, expectation_suite_name,
-                                expectation_type, run_name, inspectseq_df):
-    a_checkpoint_result = _validate_datacontext(
-        context, DATASOURCE_NAME, expectation_suite_name, run_name,
-        inspectseq_df)
-    validation_fail_df = _generate_validation_fail_df(
-        context, DATASOURCE_NAME, a_checkpoint_result, expectation_type)
-    return validation_fail_df
-
-
-def _get_latest_validation_report(report_path, df_kind=""):
-    latest_report_fp = None
-    full_report_fps = list(report_path.glob(
-        f"*{FULL_REPORT_FNAME_ROOT}{df_kind}*"))
-    if len(full_report_fps) > 0:
-        latest_report_fp = max(full_report_fps,
-                               key=lambda item: item.stat().st_ctime)
-    return latest_report_fp
-
-
-def generate_differential_validation_df(latest_report_file, current_report_df):
-    merge_col_name = "_merge"
-    latest_report_df = pandas.read_csv(latest_report_file,
-                                       na_values='', keep_default_na=False)
-    merged_df = current_report_df.merge(
-        latest_report_df.drop_duplicates(),
-        on=[FAIL_SOURCE_COL_NAME, FAIL_COL_NAME, FAIL_VAL_COL_NAME,
-            FAIL_CHECK_COL_NAME, FAIL_TYPE_COL_NAME],
-        how='left', indicator=True)
-    new_records_mask = merged_df[merge_col_name] == 'left_only'
-    differential_df = merged_df[new_records_mask].copy()
-    differential_df = differential_df.drop(merge_col_name, axis=1)   # 1 = cols
-    return differential_df
-
-
-def _save_report_file(df_kind, report_df, report_type, output_path):
-    if report_df is not None and len(report_df) > 0:
-        report_df.to_csv(output_path.absolute(), index=False)
-        print(f"{report_type} {df_kind} detected and report saved")
+# pandas, numpy, great_expectations and the modules that use them are
+# imported only in the functions that run a validation, so that --help,
+# argument errors and --service clients start quickly
+from src.metadata_constants import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME, NOT_BAD_KIND, REPORT_FORMAT_MODULES
+from src.run_profiling import RUN_PROFILE_FNAME_ROOT, profiled_run, \
+    profiled_stage
+from src.validation_service_client import submit_validation_job
+
+REPORT_TIMESTAMP_FORMAT = '%Y-%m-%d_%H-%M-%S'
+# the date in a metadata file name, eg all_samples_search_ids_20220419.csv
+METADATA_FNAME_DATE_REGEX = re.compile(r"(\d{8})$")
+
+
+def _parse_arguments(arg_list, working_dir=None):
+    # relative paths are taken relative to working_dir, if given, rather
+    # than to the current directory
+    parser = argparse.ArgumentParser(
+        prog="generate_metadata_reports",
+        description="Generate failure and warning reports for an InspectSeq "
+                    "metadata csv file.")
+    parser.add_argument("inspectseq_csv_fp", nargs="?", default=None,
+                        help="path to the all_samples_search_ids_*.csv file")
+    parser.add_argument("failure_expectation_suite_name", nargs="?",
+                        default=DEFAULT_FAIL_EXPECT_SUITE_NAME)
+    parser.add_argument("warning_expectation_suite_name", nargs="?",
+                        default=DEFAULT_WARN_EXPECT_SUITE_NAME)
+    parser.add_argument("--single-pass", action="store_true",
+                        help=f"validate the full metadata once and derive the "
+                             f"{NOT_BAD_KIND} reports from its results, "
+                             f"re-running only the frame-level checks")
+    concurrency_group = parser.add_mutually_exclusive_group()
+    concurrency_group.add_argument(
+        "--workers", type=int, default=1,
+        help="validate row shards of the metadata in this many worker "
+             "processes")
+    concurrency_group.add_argument(
+        "--concurrent-suites", choices=["thread", "process"], default=None,
+        help="run the failure and warning suites (for both the full and "
+             "not_known_bad data) at the same time, in a pool of threads or "
+             "of processes")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the metadata file in chunks of this "
+                             "many rows, writing report rows as each chunk "
+                             "is validated, so memory is bounded by the "
+                             "chunk size rather than the file size")
+    parser.add_argument("--engine", choices=["ge", "native"], default="ge",
+                        help="validate with Great Expectations checkpoints "
+                             "(the default) or by evaluating the suites' "
+                             "expectations directly with pandas")
+    parser.add_argument("--persist-results", action="store_true",
+                        help="store the full validation results and update "
+                             "the data docs, as the checkpoint's default "
+                             "actions do; off by default since the reports "
+                             "don't need them")
+    parser.add_argument("--report-format", choices=list(REPORT_FORMAT_MODULES),
+                        default="csv",
+                        help="file format of the reports: csv (the default) "
+                             "or a compressed columnar format, parquet "
+                             "(needs pyarrow or fastparquet) or feather "
+                             "(needs pyarrow)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="revalidate only the rows that are new or "
+                             "changed since the previous full report (by "
+                             "search_id), carrying forward the previous "
+                             "failures of the others; implies --single-pass")
+    parser.add_argument("--profile", action="store_true",
+                        help="record the time and memory used by each stage "
+                             "of the run (and, with the native engine, each "
+                             "expectation) in a run profile json file next "
+                             "to the reports")
+    parser.add_argument("--profile-pstats", action="store_true",
+                        help="also profile the run with cProfile and save "
+                             "its stats next to the reports; implies "
+                             "--profile")
+    parser.add_argument("--batch", nargs="+", default=None,
+                        metavar="PATH_OR_GLOB",
+                        help="validate these metadata files (and the one "
+                             "given as the first argument, if any) in "
+                             "chronological order in one run, each one's "
+                             "differential reports building on the previous "
+                             "one's reports; quote glob patterns")
+    parser.add_argument("--service", default=None, metavar="URL",
+                        help="run the validation in the service listening "
+                             "at this URL (started with "
+                             "serve_metadata_reports), eg "
+                             "http://127.0.0.1:8765, rather than loading the "
+                             "validator in this process")
+    args = parser.parse_args(arg_list[1:])
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.chunksize is not None and args.chunksize < 1:
+        parser.error("--chunksize must be at least 1")
+    args.profile = args.profile or args.profile_pstats
+    if working_dir is not None:
+        if args.inspectseq_csv_fp is not None:
+            args.inspectseq_csv_fp = \
+                str(pathlib.Path(working_dir) / args.inspectseq_csv_fp)
+        if args.batch is not None:
+            args.batch = [str(pathlib.Path(working_dir) / x)
+                          for x in args.batch]
+    if args.batch is not None:
+        args.batch = _get_batch_metadata_fps(parser, args)
+    elif args.inspectseq_csv_fp is None:
+        parser.error("the path to the metadata csv file is required")
+    format_modules = REPORT_FORMAT_MODULES[args.report_format]
+    if format_modules and not any(importlib.util.find_spec(x) is not None
+                                  for x in format_modules):
+        parser.error(f"--report-format {args.report_format} requires "
+                     f"{' or '.join(format_modules)} to be installed")
+    if args.report_format != "csv" and args.chunksize is not None:
+        parser.error("--chunksize writes csv reports only")
+    if args.single_pass and args.chunksize is not None:
+        parser.error("--single-pass can't be combined with --chunksize, "
+                     "which validates each chunk once anyway")
+    if args.persist_results and (
+            args.engine == "native" or args.workers > 1 or
+            args.concurrent_suites is not None or
+            args.chunksize is not None):
+        parser.error("--persist-results can't be combined with --engine "
+                     "native, --workers, --concurrent-suites or --chunksize, "
+                     "which don't run checkpoints")
+    if args.incremental and (args.workers > 1 or
+                             args.concurrent_suites is not None or
+                             args.chunksize is not None):
+        parser.error("--incremental can't be combined with --workers, "
+                     "--concurrent-suites or --chunksize")
+    if args.engine == "native" and (
+            args.workers > 1 or args.concurrent_suites is not None or
+            args.chunksize is not None):
+        parser.error("--engine native can't be combined with --workers, "
+                     "--concurrent-suites or --chunksize")
+    return args
+
+
+def _get_metadata_date_key(inspectseq_csv_path):
+    # the date in the file name, or failing that its modification date
+    date_match = METADATA_FNAME_DATE_REGEX.search(inspectseq_csv_path.stem)
+    if date_match is not None:
+        date_str = date_match.group(1)
     else:
-        # create an empty file as a sentinel
-        output_path.touch()
-        print(f"No {report_type} {df_kind} detected")
-
-
-def generate_failure_and_warning_reports(arg_list):
-    inspectseq_csv_fp = arg_list[1]
-    failure_expectation_suite_name = arg_list[2] if len(arg_list) == 3 else \
-        DEFAULT_FAIL_EXPECT_SUITE_NAME
-    warning_expectation_suite_name = arg_list[3] if len(arg_list) == 4 else \
-        DEFAULT_WARN_EXPECT_SUITE_NAME
+        date_str = datetime.fromtimestamp(
+            inspectseq_csv_path.stat().st_mtime).strftime("%Y%m%d")
+    return date_str, inspectseq_csv_path.name
+
+
+def _get_batch_metadata_fps(parser, args):
+    batch_patterns = list(args.batch)
+    if args.inspectseq_csv_fp is not None:
+        batch_patterns.insert(0, args.inspectseq_csv_fp)
+
+    inspectseq_csv_paths = {}
+    for curr_pattern in batch_patterns:
+        curr_fps = glob.glob(curr_pattern)
+        if len(curr_fps) == 0:
+            parser.error(f"no metadata files match {curr_pattern}")
+        for curr_fp in curr_fps:
+            curr_path = pathlib.Path(curr_fp)
+            inspectseq_csv_paths.setdefault(curr_path.resolve(), curr_path)
+
+    return [str(x) for x in sorted(inspectseq_csv_paths.values(),
+                                   key=_get_metadata_date_key)]
+
+
+def load_validation_engine(args):
+    """Load the validation engine that args asks for.
+
+    Returns the DataContext (None for the native engine), a function that
+    validates a frame with a suite--taking the suite name, suite type, run
+    name, frame and optional keep_expectation_type, and returning a
+    generate_result_fail_dfs tuple--and a function that returns a suite's
+    (expectation type, kwargs) configs.
+    """
+    from src.metadata_validation import generate_result_fail_dfs, \
+        get_suite_expectation_configs, load_data_context
+
+    if args.engine == "native":
+        # imported only when asked for: importing it finds the
+        # great_expectations directory above the working directory (and puts
+        # the plugin modules on the path without a DataContext)
+        from src.native_validation_engine import \
+            generate_native_result_fail_dfs, get_native_expectation_configs
+
+        def _generate_suite_result_fail_dfs(
+                expectation_suite_name, expectation_type, run_name, a_df,
+                keep_expectation_type=None):
+            return generate_native_result_fail_dfs(
+                expectation_suite_name, expectation_type, a_df,
+                keep_expectation_type)
+
+        return None, _generate_suite_result_fail_dfs, \
+            get_native_expectation_configs
+
+    context = load_data_context()
+
+    def _generate_suite_result_fail_dfs(
+            expectation_suite_name, expectation_type, run_name, a_df,
+            keep_expectation_type=None):
+        return generate_result_fail_dfs(
+            context, expectation_suite_name, expectation_type, run_name,
+            a_df, keep_expectation_type, args.persist_results)
+
+    def _get_expectation_configs(expectation_suite_name):
+        return get_suite_expectation_configs(context, expectation_suite_name)
+
+    return context, _generate_suite_result_fail_dfs, _get_expectation_configs
+
+
+def generate_failure_and_warning_reports(arg_list, engines=None,
+                                         working_dir=None):
+    """Generate the reports that the command-line arguments ask for.
+
+    engines, if given, maps (engine name, persist results) to validation
+    engines already loaded, and gets any this run loads; the validation
+    service passes it to keep them warm between jobs, and runs the job
+    itself even if it asks for --service.  Relative paths in arg_list are
+    taken relative to working_dir, if given.  Returns the exit code of the
+    job if it was run by a service.
+    """
+    args = _parse_arguments(arg_list, working_dir)
+    if args.service is not None and engines is None:
+        return submit_validation_job(args.service, arg_list[1:])
+
+    engine = None
+    if engines is not None:
+        engine_key = (args.engine, args.persist_results)
+        if engine_key not in engines:
+            engines[engine_key] = load_validation_engine(args)
+        engine = engines[engine_key]
+
+    if args.batch is None:
+        _generate_file_reports(args, engine)
+        return
+
+    # one engine (and so one DataContext, plugin import and set of suites)
+    # for the whole batch, and each file's full report fingerprints kept for
+    # the next file's differential
+    if engine is None:
+        engine = load_validation_engine(args)
+    report_fingerprints = {}
+    for file_index, curr_csv_fp in enumerate(args.batch):
+        print(f"Validating {curr_csv_fp} ({file_index + 1} of "
+              f"{len(args.batch)})")
+        _generate_file_reports(
+            argparse.Namespace(**{**vars(args),
+                                  "inspectseq_csv_fp": curr_csv_fp}),
+            engine, report_fingerprints)
+
+
+def _generate_file_reports(args, engine=None, report_fingerprints=None):
+    curr_datetime_str = datetime.now().strftime(REPORT_TIMESTAMP_FORMAT)
+    if not args.profile:
+        _generate_failure_and_warning_reports(
+            args, curr_datetime_str, engine, report_fingerprints)
+        return
+
+    inspectseq_csv_path = pathlib.Path(args.inspectseq_csv_fp)
+    profile_path = inspectseq_csv_path.parent / \
+        f"{inspectseq_csv_path.stem}{RUN_PROFILE_FNAME_ROOT}" \
+        f"{curr_datetime_str}.json"
+    pstats_path = profile_path.with_suffix(".pstats") \
+        if args.profile_pstats else None
+    run_info = {"metadata_fp": str(inspectseq_csv_path.absolute()),
+                "timestamp": curr_datetime_str,
+                "arguments": vars(args)}
+    with profiled_run(profile_path, run_info, pstats_path):
+        _generate_failure_and_warning_reports(
+            args, curr_datetime_str, engine, report_fingerprints)
+
+
+def _generate_failure_and_warning_reports(args, curr_datetime_str,
+                                          engine=None,
+                                          report_fingerprints=None):
+    # engine is a load_validation_engine tuple, loaded here if not given.
+    # report_fingerprints maps the full reports written earlier in a batch
+    # to their fingerprints, and gets this run's added.
+    import pandas
+
+    from src.chunked_validation import generate_chunked_reports
+    from src.incremental_validation import \
+        generate_incremental_result_fail_dfs, get_suite_fingerprint, \
+        hash_metadata_rows, load_row_state, save_row_state
+    from src.metadata_loader import read_metadata_csv
+    from src.metadata_validation import DIFF_REPORT_FNAME_ROOT, \
+        FULL_REPORT_FNAME_ROOT, METADATA_CLEARED, SAMPLE_DATETIME_COL_NAME, \
+        concat_fail_dfs, generate_differential_validation_df, \
+        get_latest_validation_report, project_subset_fail_dfs, \
+        record_report_in_manifest, save_report_file, \
+        suite_supports_projection
+    from src.parallel_validation import create_shard_executor, \
+        create_suite_executor, generate_concurrent_result_fail_dfs, \
+        generate_sharded_result_fail_dfs
+
+    inspectseq_csv_fp = args.inspectseq_csv_fp
+    failure_expectation_suite_name = args.failure_expectation_suite_name
+    warning_expectation_suite_name = args.warning_expectation_suite_name
 
     inspectseq_csv_path = pathlib.Path(inspectseq_csv_fp)
-    curr_datetime = datetime.now()
-    curr_datetime_str = curr_datetime.strftime('%Y-%m-%d_%H-%M-%S')
 
     def _get_report_path(report_name_root, df_kind):
         if df_kind != "":
             df_kind = df_kind + "_"
         fname = f"{inspectseq_csv_path.stem}{report_name_root}" \
-                f"{df_kind}{curr_datetime_str}.csv"
+                f"{df_kind}{curr_datetime_str}.{args.report_format}"
         return inspectseq_csv_path.parent / fname
 
-    context = ge.data_context.DataContext()
-
-    # IDE marks these imports as not installed, but this appears to be a
-    # quirk of Great Expectations: they become installed ONLY AFTER the
-    # DataContext is instantiated--which is why they have to be imported here
-    # rather than at the top of the module as usual
-    from expectations.expect_column_values_gte_date import \
-        ExpectColumnValuesGteDate
-    from expectations.expect_column_values_lte_date import \
-        ExpectColumnValuesLteDate
-    from expectations.expect_table_columns_not_unnamed import \
-        ExpectTableColumnsNotUnnamed
-    from expectations.expect_column_values_to_parse_into_expected_locations \
-        import ExpectColumnValuesToParseIntoExpectedLocations
-    from expectations.expect_column_values_are_unique import \
-        ExpectColumnValuesAreUnique
+    suite_names_and_types = [(failure_expectation_suite_name, "failure"),
+                             (warning_expectation_suite_name, "warning")]
+
+    def _get_run_name(df_kind):
+        return f"{inspectseq_csv_path.stem}_{df_kind}_{curr_datetime_str}"
+
+    if engine is None:
+        with profiled_stage("load_engine", engine=args.engine):
+            engine = load_validation_engine(args)
+    context, _generate_suite_result_fail_dfs, _get_expectation_configs = \
+        engine
+
+    def _generate_job_result_fail_dfs(
+            expectation_suite_name, expectation_type, df_kind, a_df,
+            keep_expectation_type=None):
+        with profiled_stage("validate", suite=expectation_suite_name,
+                            df_kind=df_kind, rows=len(a_df)):
+            return _generate_suite_result_fail_dfs(
+                expectation_suite_name, expectation_type,
+                _get_run_name(df_kind), a_df, keep_expectation_type)
+
+    # plugin modules, importable only once a DataContext exists (see
+    # load_data_context)
+    from expectations.column_datetime_parsing import \
+        parsed_datetime_columns_cached
+    from expectations.location_matching import \
+        get_allowed_locations_cache_info
+
+    def _print_allowed_locations_cache_info():
+        # profiling detail, not part of a run's usual output
+        if args.profile:
+            print(f"Allowed locations cache: "
+                  f"{get_allowed_locations_cache_info()}")
+
+    if args.chunksize is not None:
+        generate_chunked_reports(
+            context, inspectseq_csv_path, suite_names_and_types,
+            args.chunksize, _get_report_path, _get_run_name)
+        _print_allowed_locations_cache_info()
+        return
+
+    suites_expectation_configs = [_get_expectation_configs(x)
+                                  for x, _ in suite_names_and_types]
 
     inspectseq_path_str = str(inspectseq_csv_path.absolute())
-    inspectseq_df = pandas.read_csv(inspectseq_path_str, dtype={"zip": str})
+    with profiled_stage("load"):
+        inspectseq_df = read_metadata_csv(inspectseq_path_str,
+                                          suites_expectation_configs)
 
     # NB: if sample's metadata_cleared is NA, sample is not known bad.
     # This is because we have no knowledge about whether that metadata is bad.
     known_bad = inspectseq_df[METADATA_CLEARED] == False  # noqa 712
+    # a nullable boolean column compares NA to False as NA
+    known_bad = known_bad.fillna(False).astype(bool)
     inspectseq_not_known_bad_df = inspectseq_df[~known_bad].copy()
     inspectseq_not_known_bad_df.reset_index(inplace=True, drop=True)
 
-    def _generate_report_pair(df_kind, a_df):
-        run_name = f"{inspectseq_csv_path.stem}_{df_kind}_{curr_datetime_str}"
-        full_fail_report_df = generate_full_validation_df(
-            context, failure_expectation_suite_name, "failure", run_name, a_df)
-        full_warn_report_df = generate_full_validation_df(
-            context, warning_expectation_suite_name, "warning", run_name, a_df)
+    def _generate_report_pair(df_kind, full_fail_report_df,
+                              full_warn_report_df):
         full_report_df = pandas.concat(
             [full_fail_report_df, full_warn_report_df], ignore_index=True)
 
         # Important: DO NOT SAVE full report df to a file BEFORE
         # running differential report!
-        latest_report_fp = _get_latest_validation_report(
+        latest_report_fp = get_latest_validation_report(
             inspectseq_csv_path.parent, df_kind)
         if full_report_df is not None:
             if latest_report_fp is None:
@@ -238,22 +386,137 @@ def generate_failure_and_warning_reports(arg_list):
             else:
                 diff_report_path = _get_report_path(
                     DIFF_REPORT_FNAME_ROOT, df_kind)
-                diff_report_df = generate_differential_validation_df(
-                    latest_report_fp, full_report_df)
-                _save_report_file(
+                with profiled_stage("differential", df_kind=df_kind,
+                                    previous_report=latest_report_fp.name):
+                    diff_report_df = generate_differential_validation_df(
+                        latest_report_fp, full_report_df, report_fingerprints)
+                save_report_file(
                     df_kind, diff_report_df, f"Differential validation issues",
                     diff_report_path)
 
         full_report_path = _get_report_path(FULL_REPORT_FNAME_ROOT, df_kind)
-        _save_report_file(df_kind, full_report_df, f"Validation issues",
-                          full_report_path)
+        full_report_fingerprints = save_report_file(
+            df_kind, full_report_df, f"Validation issues", full_report_path,
+            save_fingerprints=True)
+        record_report_in_manifest(full_report_path)
+        if report_fingerprints is not None:
+            report_fingerprints[full_report_path] = full_report_fingerprints
+
+    # both date expectations in both report pairs read the same timestamps
+    # (the not_known_bad frame is a row subset of the full one), so parse
+    # them once for the whole run
+    with parsed_datetime_columns_cached(inspectseq_df,
+                                        [SAMPLE_DATETIME_COL_NAME]):
+        supports_projection = all(suite_supports_projection(x)
+                                  for x in suites_expectation_configs)
+        # incremental results are projected just like single-pass ones
+        single_pass = (args.single_pass or args.incremental) and \
+            supports_projection
+        incremental = args.incremental and supports_projection
+        if (args.single_pass or args.incremental) and not single_pass:
+            print("Suites use 'mostly' thresholds, so the not_known_bad "
+                  "reports can't be projected; validating twice instead")
+
+        # (suite name, suite type, df kind, frame) for every validation run
+        validation_jobs = []
+        for curr_suite_name, curr_suite_type in suite_names_and_types:
+            validation_jobs.append(
+                (curr_suite_name, curr_suite_type, "", inspectseq_df))
+            if not single_pass:
+                validation_jobs.append(
+                    (curr_suite_name, curr_suite_type, NOT_BAD_KIND,
+                     inspectseq_not_known_bad_df))
+
+        if args.concurrent_suites is not None:
+            with create_suite_executor(args.concurrent_suites,
+                                       len(validation_jobs)) as executor:
+                job_results = generate_concurrent_result_fail_dfs(
+                    executor, [(x[0], x[1], _get_run_name(x[2]), x[3])
+                               for x in validation_jobs])
+        elif args.workers > 1:
+            with create_shard_executor(args.workers) as executor:
+                job_results = [
+                    generate_sharded_result_fail_dfs(
+                        executor, context, x[0], x[1], _get_run_name(x[2]),
+                        x[3], args.workers)
+                    for x in validation_jobs]
+        elif incremental:
+            suite_fingerprint = get_suite_fingerprint(
+                suites_expectation_configs)
+            row_hashes = hash_metadata_rows(inspectseq_df)
+            # Important: find the previous full report BEFORE saving this
+            # run's reports!
+            row_state = load_row_state(
+                get_latest_validation_report(inspectseq_csv_path.parent),
+                suite_fingerprint, inspectseq_df.columns)
+            job_results = [
+                generate_incremental_result_fail_dfs(
+                    functools.partial(_generate_job_result_fail_dfs,
+                                      x[0], x[1], x[2]),
+                    y, suites_expectation_configs[y], x[1], x[3],
+                    row_hashes, row_state)
+                for y, x in enumerate(validation_jobs)]
+        else:
+            job_results = [_generate_job_result_fail_dfs(*x)
+                           for x in validation_jobs]
+
+        # assemble the reports in the same (suite) order however the
+        # validations were run
+        result_fail_dfs = {(x[0], x[2]): y
+                           for x, y in zip(validation_jobs, job_results)}
+        full_fail_dfs = []
+        not_known_bad_fail_dfs = []
+        for curr_suite_name, curr_suite_type in suite_names_and_types:
+            curr_result_fail_dfs, curr_expectation_types = \
+                result_fail_dfs[(curr_suite_name, "")]
+            if single_pass:
+                with profiled_stage("project", suite=curr_suite_name,
+                                    df_kind=NOT_BAD_KIND):
+                    curr_not_known_bad_result_fail_dfs = \
+                        project_subset_fail_dfs(
+                            lambda x, y: _generate_job_result_fail_dfs(
+                                curr_suite_name, curr_suite_type,
+                                NOT_BAD_KIND, x, y),
+                            inspectseq_df, ~known_bad, curr_result_fail_dfs,
+                            curr_expectation_types)
+            else:
+                curr_not_known_bad_result_fail_dfs, _ = \
+                    result_fail_dfs[(curr_suite_name, NOT_BAD_KIND)]
+
+            with profiled_stage("validation_fail_df", suite=curr_suite_name,
+                                df_kind=""):
+                full_fail_dfs.append(concat_fail_dfs(curr_result_fail_dfs))
+            with profiled_stage("validation_fail_df", suite=curr_suite_name,
+                                df_kind=NOT_BAD_KIND):
+                not_known_bad_fail_dfs.append(
+                    concat_fail_dfs(curr_not_known_bad_result_fail_dfs))
+
+        _generate_report_pair("", *full_fail_dfs)
+        _generate_report_pair(NOT_BAD_KIND, *not_known_bad_fail_dfs)
+
+        if incremental:
+            save_row_state(
+                _get_report_path(FULL_REPORT_FNAME_ROOT, ""), inspectseq_df,
+                row_hashes, suite_fingerprint,
+                [result_fail_dfs[(x, "")][0] for x, _ in suite_names_and_types],
+                suites_expectation_configs)
+
+    _print_allowed_locations_cache_info()
+
 
-    _generate_report_pair("", inspectseq_df)
-    _generate_report_pair(NOT_BAD_KIND, inspectseq_not_known_bad_df)
+def __getattr__(name):
+    # generate_full_validation_df is still importable from here, as before
+    # it moved, without importing pandas whenever this module is
+    if name == "generate_full_validation_df":
+        from src.metadata_validation import generate_full_validation_df
+        return generate_full_validation_df
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def main():
-    generate_failure_and_warning_reports(argv)
+    exit_code = generate_failure_and_warning_reports(argv)
+    if exit_code:
+        raise SystemExit(exit_code)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,242 @@
+import hashlib
+import json
+
+import numpy
+import pandas
+
+from src.metadata_validation import \
+    FAIL_VAL_COL_NAME, FRAME_LEVEL_EXPECTATION_TYPES, SEARCH_ID_COL_NAME, \
+    build_fail_df, concat_fail_dfs
+
+ROW_STATE_FNAME_SUFFIX = ".rows.npz"
+# kwargs naming a file whose contents an expectation checks values against
+FILE_VALUED_KWARG_NAMES = ["allowed_locations_abs_fp"]
+
+
+def _get_row_state_path(report_path):
+    return report_path.with_name(report_path.name + ROW_STATE_FNAME_SUFFIX)
+
+
+def _hash_file_contents(kwarg_value):
+    # None for a file that can't be read (the validation reports that), or
+    # for a kwarg that holds the values themselves rather than a path
+    if not isinstance(kwarg_value, str):
+        return None
+    try:
+        with open(kwarg_value, "rb") as kwarg_file:
+            return hashlib.sha256(kwarg_file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def get_suite_fingerprint(suites_expectation_configs):
+    """Hash the (type, kwargs) configs of every suite, in order.
+
+    The contents of the files that kwargs point to (eg, the allowed
+    locations yaml) are hashed too, so that editing one changes the
+    fingerprint even though the configs themselves are unchanged.
+    """
+    file_hashes = [
+        [_hash_file_contents(y[x]) for x in FILE_VALUED_KWARG_NAMES
+         if x in y]
+        for curr_configs in suites_expectation_configs
+        for _, y in curr_configs]
+    configs_str = json.dumps([suites_expectation_configs, file_hashes],
+                             sort_keys=True, default=str)
+    return hashlib.sha256(configs_str.encode("utf-8")).hexdigest()
+
+
+def get_whole_frame_types(expectation_configs):
+    # frame-level expectations depend on other rows, and those with
+    # evaluation parameters (eg, now()) can change outcome for an unchanged
+    # row, so both are always run on the whole frame
+    return set(FRAME_LEVEL_EXPECTATION_TYPES) | {
+        x for x, y in expectation_configs
+        if any(isinstance(z, dict) and "$PARAMETER" in z
+               for z in y.values())}
+
+
+def hash_metadata_rows(inspectseq_df):
+    return pandas.util.hash_pandas_object(inspectseq_df, index=False) \
+        .to_numpy()
+
+
+def _get_search_id_strs(inspectseq_df):
+    # rows with a null or repeated search_id can't be matched to a row of
+    # another file, so they get an empty id and are always revalidated
+    search_ids = inspectseq_df[SEARCH_ID_COL_NAME]
+    is_matchable = (search_ids.notna() &
+                    ~search_ids.duplicated(keep=False)).to_numpy()
+    search_id_strs = search_ids.astype(object).map(
+        str, na_action="ignore").to_numpy(dtype=object)
+    search_id_strs[~is_matchable] = ""
+    return search_id_strs
+
+
+def load_row_state(report_path, suite_fingerprint, column_names):
+    """Load the row state saved with a previous full report, if usable.
+
+    Returns None if there is no row state for that report, or if it was made
+    with different suites (see get_suite_fingerprint) or metadata columns.
+    """
+    if report_path is None:
+        return None
+
+    row_state_path = _get_row_state_path(report_path)
+    if not row_state_path.exists():
+        print(f"No row state saved with {report_path.name}, so validating "
+              f"every row")
+        return None
+
+    with numpy.load(row_state_path, allow_pickle=False) as row_state_file:
+        row_state = {x: row_state_file[x] for x in row_state_file.files}
+    if str(row_state["suite_fingerprint"]) != suite_fingerprint or \
+            list(row_state["column_names"]) != list(column_names):
+        print(f"Suites (or files they check against) or metadata columns "
+              f"have changed since {report_path.name}, so validating every "
+              f"row")
+        return None
+    return row_state
+
+
+def save_row_state(report_path, inspectseq_df, row_hashes, suite_fingerprint,
+                   suites_result_fail_dfs, suites_expectation_configs):
+    """Save the row hashes and carry-forward failures of a full validation.
+
+    suites_result_fail_dfs holds the per-expectation fail dfs for each
+    suite, aligned with suites_expectation_configs.
+    """
+    search_id_strs = _get_search_id_strs(inspectseq_df)
+    is_matchable = search_id_strs != ""
+
+    fail_suite_indices = []
+    fail_expectation_indices = []
+    fail_search_ids = []
+    fail_values = []
+    for suite_index, (curr_result_fail_dfs, curr_configs) in enumerate(
+            zip(suites_result_fail_dfs, suites_expectation_configs)):
+        whole_frame_types = get_whole_frame_types(curr_configs)
+        for expectation_index, (curr_fail_df, (curr_type, _)) in enumerate(
+                zip(curr_result_fail_dfs, curr_configs)):
+            if curr_fail_df is None or curr_type in whole_frame_types:
+                continue
+
+            fail_positions = inspectseq_df.index.get_indexer(
+                curr_fail_df.index)
+            keep_mask = is_matchable[fail_positions]
+            fail_suite_indices.append(
+                numpy.full(keep_mask.sum(), suite_index))
+            fail_expectation_indices.append(
+                numpy.full(keep_mask.sum(), expectation_index))
+            fail_search_ids.append(
+                search_id_strs[fail_positions[keep_mask]])
+            fail_values.append(
+                curr_fail_df[FAIL_VAL_COL_NAME].to_numpy(
+                    dtype=object)[keep_mask])
+
+    def _concat(arrays, dtype):
+        return numpy.concatenate([numpy.empty(0, dtype=dtype)] + arrays)
+
+    with open(_get_row_state_path(report_path), "wb") as row_state_file:
+        numpy.savez(
+            row_state_file,
+            suite_fingerprint=numpy.array(suite_fingerprint),
+            column_names=numpy.array(list(inspectseq_df.columns), dtype=str),
+            search_ids=search_id_strs[is_matchable].astype(str),
+            row_hashes=row_hashes[is_matchable],
+            fail_suite_indices=_concat(fail_suite_indices, int),
+            fail_expectation_indices=_concat(fail_expectation_indices, int),
+            fail_search_ids=_concat(fail_search_ids, object).astype(str),
+            fail_values=_concat(fail_values, object).astype(str))
+
+
+def generate_incremental_result_fail_dfs(
+        generate_subset_fail_dfs, suite_index, expectation_configs,
+        expectation_suite_type, inspectseq_df, row_hashes, row_state):
+    """Validate only the rows that changed since row_state was saved.
+
+    Row-local expectations run only on new or changed rows (by search_id and
+    row hash); the previous failures of unchanged rows are carried forward.
+    The rest of the expectations run on the whole frame, through
+    generate_subset_fail_dfs(a_df, keep_expectation_type), which returns a
+    generate_result_fail_dfs tuple.  Returns the same tuple, in suite order.
+    """
+    whole_frame_types = get_whole_frame_types(expectation_configs)
+    search_id_strs = _get_search_id_strs(inspectseq_df)
+
+    is_unchanged = numpy.zeros(len(inspectseq_df), dtype=bool)
+    if row_state is not None:
+        previous_positions = pandas.Index(row_state["search_ids"]) \
+            .get_indexer(search_id_strs)
+        is_unchanged = (search_id_strs != "") & (previous_positions >= 0)
+        is_unchanged[is_unchanged] = \
+            row_state["row_hashes"][previous_positions[is_unchanged]] == \
+            row_hashes[is_unchanged]
+    changed_positions = numpy.flatnonzero(~is_unchanged)
+    unchanged_positions = numpy.flatnonzero(is_unchanged)
+    print(f"Revalidating {len(changed_positions)} new or changed rows of "
+          f"{len(inspectseq_df)}")
+
+    # fresh failures of the changed rows, keyed by expectation index
+    fresh_fail_dfs = {}
+    if len(changed_positions) > 0:
+        changed_df = inspectseq_df.iloc[changed_positions].copy()
+        changed_df.reset_index(inplace=True, drop=True)
+        changed_fail_dfs, _ = generate_subset_fail_dfs(
+            changed_df, lambda x: x not in whole_frame_types)
+        changed_fail_dfs = iter(changed_fail_dfs)
+        for expectation_index, (curr_type, _) in enumerate(
+                expectation_configs):
+            if curr_type in whole_frame_types:
+                continue
+            curr_fail_df = next(changed_fail_dfs)
+            if curr_fail_df is not None:
+                curr_fail_df.index = inspectseq_df.index[
+                    changed_positions[curr_fail_df.index]]
+            fresh_fail_dfs[expectation_index] = curr_fail_df
+
+    whole_frame_fail_dfs, _ = generate_subset_fail_dfs(
+        inspectseq_df, lambda x: x in whole_frame_types)
+    whole_frame_fail_dfs = iter(whole_frame_fail_dfs)
+
+    # previous failures of the unchanged rows
+    carried_positions = numpy.empty(0, dtype=int)
+    if row_state is not None:
+        in_suite_mask = row_state["fail_suite_indices"] == suite_index
+        carried_positions = pandas.Index(
+            search_id_strs[unchanged_positions]).get_indexer(
+            row_state["fail_search_ids"][in_suite_mask])
+        carried_expectation_indices = \
+            row_state["fail_expectation_indices"][in_suite_mask]
+        carried_values = row_state["fail_values"][in_suite_mask]
+
+    result_fail_dfs = []
+    for expectation_index, (curr_type, curr_kwargs) in enumerate(
+            expectation_configs):
+        if curr_type in whole_frame_types:
+            result_fail_dfs.append(next(whole_frame_fail_dfs))
+            continue
+
+        curr_fail_dfs = [fresh_fail_dfs.get(expectation_index)]
+        if len(carried_positions) > 0:
+            carried_mask = (carried_expectation_indices == expectation_index) \
+                & (carried_positions >= 0)
+            curr_positions = unchanged_positions[
+                carried_positions[carried_mask]]
+            if len(curr_positions) > 0:
+                fail_sources = \
+                    inspectseq_df[SEARCH_ID_COL_NAME].iloc[curr_positions]
+                curr_fail_dfs.append(build_fail_df(
+                    fail_sources.to_numpy(), curr_kwargs["column"],
+                    carried_values[carried_mask].tolist(), curr_type,
+                    expectation_suite_type, index=fail_sources.index))
+
+        # in row order, as a full validation would report them
+        curr_fail_df = concat_fail_dfs(curr_fail_dfs)
+        if curr_fail_df is not None:
+            curr_fail_df = curr_fail_df.iloc[numpy.argsort(
+                inspectseq_df.index.get_indexer(curr_fail_df.index),
+                kind="stable")]
+        result_fail_dfs.append(curr_fail_df)
+
+    return result_fail_dfs, [x for x, _ in expectation_configs]
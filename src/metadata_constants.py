@@ -0,0 +1,9 @@
+# constants the command line parsers need, kept apart from
+# metadata_validation so that --help doesn't have to import pandas
+DEFAULT_FAIL_EXPECT_SUITE_NAME = "inspectseq_metadata_failure_draft10"
+DEFAULT_WARN_EXPECT_SUITE_NAME = "inspectseq_metadata_warning_draft5"
+NOT_BAD_KIND = "not_known_bad"
+# report format -> modules that can write it (any one will do)
+REPORT_FORMAT_MODULES = {"csv": [],
+                         "parquet": ["pyarrow", "fastparquet"],
+                         "feather": ["pyarrow"]}
@@ -0,0 +1,174 @@
+import numpy
+import pandas
+
+from src.metadata_validation import METADATA_CLEARED
+
+MATCH_SET_EXPECTATION_TYPE = "expect_table_columns_to_match_set"
+IN_TYPE_LIST_EXPECTATION_TYPE = "expect_column_values_to_be_in_type_list"
+UNNAMED_COL_PREFIX = "Unnamed"
+
+# few distinct values, repeated on every row
+LOW_CARDINALITY_COL_NAMES = ["source", "specimen_type", "subject_gender",
+                             "state_code", "subject_species"]
+FLOAT_COL_NAMES = ["subject_age"]
+# read as strings so that, eg, zip codes keep their leading zeros
+STRING_COL_NAMES = ["zip"]
+# submit_to_gisaid is NOT read as nullable boolean: its nulls would then be
+# reported as <NA> rather than nan
+NULLABLE_BOOLEAN_COL_NAMES = [METADATA_CLEARED]
+# dtypes of the columns that aren't inferred if the file doesn't fit the
+# schema
+LEGACY_COL_DTYPES = {"zip": str}
+
+
+def build_metadata_schema(suites_expectation_configs):
+    """Return the columns to read and their dtypes, from the suites.
+
+    Only the columns the suites expect (plus metadata_cleared) are read.  A
+    column whose type the suites check keeps its inferred dtype--unless it is
+    a float column, which the check expects anyway--so that the check still
+    sees what is in the file.
+    """
+    expected_col_names = [METADATA_CLEARED]
+    type_checked_col_names = set()
+    for curr_configs in suites_expectation_configs:
+        for curr_type, curr_kwargs in curr_configs:
+            if curr_type == MATCH_SET_EXPECTATION_TYPE:
+                expected_col_names.extend(
+                    x for x in curr_kwargs["column_set"]
+                    if x not in expected_col_names)
+            elif curr_type == IN_TYPE_LIST_EXPECTATION_TYPE:
+                type_checked_col_names.add(curr_kwargs["column"])
+
+    col_dtypes = {}
+    for curr_col_name in expected_col_names:
+        if curr_col_name in FLOAT_COL_NAMES:
+            col_dtypes[curr_col_name] = "float64"
+        elif curr_col_name in STRING_COL_NAMES:
+            col_dtypes[curr_col_name] = str
+        elif curr_col_name in NULLABLE_BOOLEAN_COL_NAMES:
+            col_dtypes[curr_col_name] = "boolean"
+        elif curr_col_name in type_checked_col_names:
+            continue
+        elif curr_col_name in LOW_CARDINALITY_COL_NAMES:
+            col_dtypes[curr_col_name] = "category"
+        else:
+            col_dtypes[curr_col_name] = str
+
+    return expected_col_names, col_dtypes
+
+
+def read_metadata_csv_legacy(inspectseq_path_str):
+    return pandas.read_csv(inspectseq_path_str, dtype=LEGACY_COL_DTYPES)
+
+
+def _get_use_col_names(inspectseq_path_str, expected_col_names):
+    # keep unnamed columns too, since the suites check for them; missing
+    # expected columns are simply absent, for the suites to report
+    header_col_names = pandas.read_csv(inspectseq_path_str, nrows=0).columns
+    return [x for x in header_col_names
+            if x in expected_col_names or x.startswith(UNNAMED_COL_PREFIX)]
+
+
+def read_metadata_csv(inspectseq_path_str, suites_expectation_configs):
+    """Read a metadata csv with the dtypes and columns the suites need.
+
+    Falls back to reading every column with inferred dtypes if the file
+    doesn't fit the schema (eg, a non-numeric age), so that the validation
+    itself reports the problem.  Uses the default (C) engine, as
+    read_metadata_csv_chunks does: the pyarrow engine applies the dtypes
+    after parsing, so nulls can come back as "", "None" or None rather than
+    NaN.
+    """
+    expected_col_names, col_dtypes = build_metadata_schema(
+        suites_expectation_configs)
+    use_col_names = _get_use_col_names(inspectseq_path_str,
+                                       expected_col_names)
+    try:
+        return pandas.read_csv(
+            inspectseq_path_str, usecols=use_col_names,
+            dtype={x: y for x, y in col_dtypes.items()
+                   if x in use_col_names})
+    except (ValueError, TypeError) as ex:
+        print(f"Metadata doesn't fit the expected column types ({ex}), so "
+              f"reading it with inferred types")
+        return read_metadata_csv_legacy(inspectseq_path_str)
+
+
+def _get_whole_file_dtypes(inspectseq_path_str, use_col_names, col_dtypes,
+                           infer_col_names, chunksize):
+    # the dtypes that make chunks read like the whole file: the read_csv
+    # dtypes (col_dtypes, plus str for columns that only some chunks parse
+    # as strings, since the whole file would be read as strings) and the
+    # dtypes to convert the other inferred columns to.  Those combine the
+    # chunks' dtypes as pandas combines the blocks of a file it parses in
+    # one go; a chunk where the column is all null says nothing about its
+    # type.  Also raises if a chunk doesn't fit col_dtypes.
+    check_col_names = infer_col_names + [
+        x for x, y in col_dtypes.items()
+        if x in use_col_names and y not in (str, "category")]
+    chunk_dtypes = {x: [] for x in infer_col_names}
+    chunk_is_str = {x: [] for x in infer_col_names}
+    with pandas.read_csv(
+            inspectseq_path_str, usecols=check_col_names,
+            dtype={x: y for x, y in col_dtypes.items()
+                   if x in check_col_names},
+            chunksize=chunksize) as chunk_reader:
+        for curr_chunk in chunk_reader:
+            for curr_col_name in infer_col_names:
+                curr_column = curr_chunk[curr_col_name]
+                if curr_column.notna().any():
+                    chunk_dtypes[curr_col_name].append(curr_column.dtype)
+                    chunk_is_str[curr_col_name].append(
+                        pandas.api.types.infer_dtype(curr_column) == "string")
+
+    read_dtypes = {x: y for x, y in col_dtypes.items() if x in use_col_names}
+    convert_dtypes = {}
+    for curr_col_name in infer_col_names:
+        if any(chunk_is_str[curr_col_name]) and \
+                not all(chunk_is_str[curr_col_name]):
+            read_dtypes[curr_col_name] = str
+        elif chunk_dtypes[curr_col_name]:
+            convert_dtypes[curr_col_name] = pandas.concat(
+                [pandas.Series([], dtype=x)
+                 for x in chunk_dtypes[curr_col_name]]).dtype
+        else:
+            # an all-null column reads as float64
+            convert_dtypes[curr_col_name] = numpy.dtype("float64")
+    return read_dtypes, convert_dtypes
+
+
+def read_metadata_csv_chunks(inspectseq_path_str, suites_expectation_configs,
+                             chunksize):
+    """Yield a metadata csv in chunks of chunksize rows.
+
+    Every chunk has the columns and dtypes that read_metadata_csv gives the
+    whole file (including its fallback to inferred dtypes).  Columns whose
+    dtype is inferred are first read on their own, to find the dtype of the
+    whole column; otherwise a chunk would get the dtype of its own values
+    (eg, bool for a chunk with no missing submit_to_gisaid values, where the
+    file as a whole reads as object).
+    """
+    expected_col_names, col_dtypes = build_metadata_schema(
+        suites_expectation_configs)
+    use_col_names = _get_use_col_names(inspectseq_path_str,
+                                       expected_col_names)
+    try:
+        read_dtypes, convert_dtypes = _get_whole_file_dtypes(
+            inspectseq_path_str, use_col_names, col_dtypes,
+            [x for x in use_col_names if x not in col_dtypes], chunksize)
+    except (ValueError, TypeError) as ex:
+        print(f"Metadata doesn't fit the expected column types ({ex}), so "
+              f"reading it with inferred types")
+        use_col_names = list(
+            pandas.read_csv(inspectseq_path_str, nrows=0).columns)
+        read_dtypes, convert_dtypes = _get_whole_file_dtypes(
+            inspectseq_path_str, use_col_names, LEGACY_COL_DTYPES,
+            [x for x in use_col_names if x not in LEGACY_COL_DTYPES],
+            chunksize)
+
+    with pandas.read_csv(inspectseq_path_str, usecols=use_col_names,
+                         dtype=read_dtypes, chunksize=chunksize) as \
+            chunk_reader:
+        for curr_chunk in chunk_reader:
+            yield curr_chunk.astype(convert_dtypes)
@@ -0,0 +1,614 @@
+import hashlib
+import os
+import pathlib
+import re
+
+import numpy
+import pandas
+
+# still importable from here, as before they moved
+from src.metadata_constants import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME, NOT_BAD_KIND, \
+    REPORT_FORMAT_MODULES  # noqa F401
+from src.run_profiling import profiled_stage
+
+DATASOURCE_NAME = "inspectseq_metadata"
+METADATA_CLEARED = "metadata_cleared"
+FULL_REPORT_FNAME_ROOT = "_validation_report_"
+
+# NB: ensure DIFF_REPORT_FNAME_ROOT is not substring of FULL_REPORT_FNAME_ROOT
+DIFF_REPORT_FNAME_ROOT = "_validation_differential_report_"
+SEARCH_ID_COL_NAME = "search_id"
+SAMPLE_DATETIME_COL_NAME = "sample_collection_datetime"
+FAIL_SOURCE_COL_NAME = "fail_source"
+FAIL_COL_NAME = "fail_column"
+FAIL_VAL_COL_NAME = "fail_value"
+FAIL_CHECK_COL_NAME = "fail_check"
+FAIL_TYPE_COL_NAME = "fail_type"
+REPORT_MANIFEST_FNAME = "validation_report_manifest.tsv"
+# key of the manifest line holding the digest of the report names
+MANIFEST_LISTING_KEY = "#listing"
+# <metadata stem>_validation_report_[<df kind>_]<timestamp>.<report format>
+FULL_REPORT_FNAME_REGEX = re.compile(
+    rf"^.*{FULL_REPORT_FNAME_ROOT}(?:(?P<df_kind>.+)_)?"
+    rf"(?P<timestamp>\d{{4}}-\d{{2}}-\d{{2}}_\d{{2}}-\d{{2}}-\d{{2}})"
+    rf"\.(?:{'|'.join(REPORT_FORMAT_MODULES)})$")
+# repeated in every row of a report, so dictionary-encoded in columnar ones
+CONSTANT_REPORT_COL_NAMES = [FAIL_COL_NAME, FAIL_CHECK_COL_NAME,
+                             FAIL_TYPE_COL_NAME]
+FINGERPRINTS_FNAME_SUFFIX = ".fingerprints.npy"
+FINGERPRINTS_DTYPE = [("fingerprint", "<u8"), ("count", "<u8")]
+REPORT_KEY_COL_NAMES = [FAIL_SOURCE_COL_NAME, FAIL_COL_NAME, FAIL_VAL_COL_NAME,
+                        FAIL_CHECK_COL_NAME, FAIL_TYPE_COL_NAME]
+
+# expectations whose outcome for a row depends on other rows (or on no rows
+# at all), so they can't be derived for a row subset by filtering the
+# results for the full frame
+UNIQUE_EXPECTATION_TYPE = "expect_column_values_are_unique"
+TABLE_LEVEL_EXPECTATION_TYPES = ("expect_table_columns_to_match_set",
+                                 "expect_table_columns_not_unnamed")
+FRAME_LEVEL_EXPECTATION_TYPES = \
+    (UNIQUE_EXPECTATION_TYPE,) + TABLE_LEVEL_EXPECTATION_TYPES
+
+
+def _validate_datacontext(context, datasource_name, expectation_suite_name,
+                          default_data_name, inspectseq_df,
+                          persist_results=False):
+    batch_request = {
+        "datasource_name": datasource_name,
+        "data_connector_name": "default_runtime_data_connector_name",
+        "data_asset_name": default_data_name
+    }
+
+    checkpoint_config = {
+        "name": "input_df_checkpoint",
+        "class_name": "SimpleCheckpoint",
+        "validations": [
+            {
+                "batch_request": batch_request,
+                "expectation_suite_name": expectation_suite_name
+            }
+        ],
+        "runtime_configuration": {
+            "result_format": {
+                "result_format": "COMPLETE",
+                "include_unexpected_rows": True,
+            }
+        }
+    }
+
+    if not persist_results:
+        # a plain Checkpoint with no actions, rather than a SimpleCheckpoint
+        # with its default store and data docs actions: the (COMPLETE,
+        # unexpected rows and all) validation results are never read back,
+        # so writing them out as json on every run is wasted I/O
+        checkpoint_config.update({"class_name": "Checkpoint",
+                                  "config_version": 1.0,
+                                  "action_list": []})
+
+    context.add_checkpoint(**checkpoint_config)
+
+    # switched over to passing in a dataframe rather than letting great
+    # expectations load the csv into a dataframe behind the scenes in order
+    # to prevent GE/pandas from automagically converting zip codes to floating-
+    # point numbers--sheesh.
+    checkpoint_result = context.run_checkpoint(
+        checkpoint_name="input_df_checkpoint",
+        batch_request={
+            "runtime_parameters": {"batch_data": inspectseq_df},
+            "batch_identifiers": {
+                "default_identifier_name": default_data_name
+            },
+        },
+    )
+
+    return checkpoint_result
+
+
+def validate_expectation_subset(context, datasource_name,
+                                expectation_suite_name, default_data_name,
+                                inspectseq_df, keep_expectation_type):
+    # imported here, like all of great_expectations, because importing it
+    # takes seconds that a run with the native engine (or --help) doesn't
+    # need to spend
+    from great_expectations.core.batch import RuntimeBatchRequest
+
+    # run only some of a suite's expectations, via a validator on an
+    # in-memory copy of the suite, so that nothing is written to the
+    # expectation store
+    subset_suite = context.get_expectation_suite(expectation_suite_name)
+    subset_suite.expectations = [
+        x for x in subset_suite.expectations
+        if keep_expectation_type(x.expectation_type)]
+
+    batch_request = RuntimeBatchRequest(
+        datasource_name=datasource_name,
+        data_connector_name="default_runtime_data_connector_name",
+        data_asset_name=default_data_name,
+        runtime_parameters={"batch_data": inspectseq_df},
+        batch_identifiers={"default_identifier_name": default_data_name})
+    validator = context.get_validator(batch_request=batch_request,
+                                      expectation_suite=subset_suite)
+    validation_result = validator.validate(
+        result_format={"result_format": "COMPLETE",
+                       "include_unexpected_rows": True})
+    return validation_result.results
+
+
+def _get_checkpoint_results(checkpoint_result):
+    validation_result_id = \
+        checkpoint_result.list_validation_result_identifiers()[0]
+    return checkpoint_result.run_results[
+        validation_result_id]["validation_result"].results
+
+
+def build_row_fail_df(a_dataframe, fail_column, fail_positions, fail_values,
+                      fail_type, expectation_suite_type):
+    # keeps the rows' labels in a_dataframe as the index
+    fail_sources = a_dataframe[SEARCH_ID_COL_NAME].iloc[fail_positions]
+    return build_fail_df(fail_sources.to_numpy(), fail_column, fail_values,
+                         fail_type, expectation_suite_type,
+                         index=fail_sources.index)
+
+
+def build_column_fail_df(fail_key, fail_cols, fail_type,
+                         expectation_suite_type):
+    return build_fail_df("column", fail_cols, [fail_key] * len(fail_cols),
+                         fail_type, expectation_suite_type)
+
+
+def _fail_values_to_strs(fail_values):
+    # str() of every value, in bulk: most fail values are strings already.
+    # pandas' string cast keeps nulls as nulls, so those (usually few) are
+    # given their str() afterwards, eg "nan" and "None".
+    fail_values = numpy.asarray(fail_values, dtype=object)
+    if pandas.api.types.infer_dtype(fail_values, skipna=False) == "string":
+        return fail_values
+
+    fail_strs = pandas.array(fail_values, dtype=str).to_numpy(dtype=object)
+    null_mask = pandas.isna(fail_values)
+    fail_strs[null_mask] = [str(x) for x in fail_values[null_mask]]
+    return fail_strs
+
+
+def build_fail_df(fail_sources, fail_cols, fail_values, fail_type,
+                  expectation_suite_type, index=None):
+    # force the fail values to be recorded as strings, since otherwise
+    # if they are all numbers, pandas coerces them to numeric, which
+    # then makes for issues comparing to any previous failure report
+    # where NOT all the fail values were numeric and thus the column
+    # was stored as a string :-|
+    fail_values = _fail_values_to_strs(fail_values)
+    if index is None:
+        index = pandas.RangeIndex(len(fail_values))
+
+    # scalars are broadcast to every row
+    return pandas.DataFrame({FAIL_SOURCE_COL_NAME: fail_sources,
+                             FAIL_COL_NAME: fail_cols,
+                             FAIL_VAL_COL_NAME: fail_values,
+                             FAIL_CHECK_COL_NAME: fail_type,
+                             FAIL_TYPE_COL_NAME: expectation_suite_type},
+                            index=index)
+
+
+def build_result_fail_df(a_dataframe, curr_result, expectation_suite_type):
+    if curr_result.success:
+        return None
+
+    if curr_result.exception_info and \
+            curr_result.exception_info['raised_exception']:
+        print(f"Validation failed: {curr_result.exception_info}")
+        return None
+
+    fail_type = curr_result.expectation_config.expectation_type
+    if 'unexpected_index_list' in curr_result.result:
+        # NB: the unexpected index list holds row labels, which are used as
+        # positions; every validated frame has a default RangeIndex
+        return build_row_fail_df(
+            a_dataframe, curr_result.expectation_config.kwargs["column"],
+            curr_result.result['unexpected_index_list'],
+            curr_result.result["unexpected_list"], fail_type,
+            expectation_suite_type)
+    elif "details" in curr_result.result and "mismatched" in \
+            curr_result.result["details"]:
+        fail_info = curr_result.result["details"]["mismatched"]
+        fail_key = "missing" if "missing" in fail_info \
+            else "unexpected"
+        return build_column_fail_df(fail_key, fail_info[fail_key],
+                                    fail_type, expectation_suite_type)
+    else:
+        raise ValueError(f"unrecognized outputs for expectation "
+                         f"{fail_type}")
+
+
+def concat_fail_dfs(fail_dfs):
+    fail_dfs = [x for x in fail_dfs if x is not None]
+    if len(fail_dfs) == 0:
+        return None
+
+    # one concat for all the pieces, rather than one per piece
+    fail_df = pandas.concat(fail_dfs)
+    # each of these holds only a handful of distinct values
+    for curr_col_name in CONSTANT_REPORT_COL_NAMES:
+        fail_df[curr_col_name] = fail_df[curr_col_name].astype("category")
+    return fail_df
+
+
+def build_result_fail_dfs(a_dataframe, results, expectation_suite_type):
+    # NB: a_dataframe must be the frame that was validated (ie, the batch
+    # data), since the unexpected indices are resolved against it.  Row-local
+    # failures keep that frame's row labels as their index.
+    return [build_result_fail_df(a_dataframe, x, expectation_suite_type)
+            for x in results]
+
+
+def build_validation_fail_df(a_dataframe, results,
+                             expectation_suite_type):
+    with profiled_stage("validation_fail_df",
+                        suite_type=expectation_suite_type):
+        return concat_fail_dfs(build_result_fail_dfs(
+            a_dataframe, results, expectation_suite_type))
+
+
+def _project_validation_fail_dfs(full_fail_dfs, expectation_types,
+                                 subset_frame_level_fail_dfs,
+                                 kept_row_labels):
+    # Row-local failures for a row subset are exactly the full frame's
+    # failures on the subset's rows; frame-level failures come from
+    # validating the subset itself.  full_fail_dfs and expectation_types
+    # line up with the whole suite, subset_frame_level_fail_dfs with just
+    # its frame-level expectations, all in suite order.
+    subset_frame_level_fail_dfs = iter(subset_frame_level_fail_dfs)
+
+    fail_dfs = []
+    for curr_fail_df, curr_type in zip(full_fail_dfs, expectation_types):
+        if curr_type in FRAME_LEVEL_EXPECTATION_TYPES:
+            curr_fail_df = next(subset_frame_level_fail_dfs)
+        elif curr_fail_df is not None:
+            curr_fail_df = curr_fail_df[
+                curr_fail_df.index.isin(kept_row_labels)]
+            if len(curr_fail_df) == 0:
+                curr_fail_df = None
+        fail_dfs.append(curr_fail_df)
+
+    return fail_dfs
+
+
+def suite_supports_projection(suite_expectation_configs):
+    # with a "mostly" threshold, an expectation that passes on the full
+    # frame can fail on a subset, which projection would miss
+    return not any(x.get("mostly") is not None
+                   for _, x in suite_expectation_configs)
+
+
+def get_suite_expectation_configs(context, expectation_suite_name):
+    """Return (expectation type, kwargs) for each of a suite's expectations."""
+    a_suite = context.get_expectation_suite(expectation_suite_name)
+    return [(x.expectation_type, x.kwargs) for x in a_suite.expectations]
+
+
+def generate_result_fail_dfs(context, expectation_suite_name,
+                             expectation_type, run_name, inspectseq_df,
+                             keep_expectation_type=None,
+                             persist_results=False):
+    """Validate inspectseq_df and return its fail df for each expectation.
+
+    Returns a tuple of the per-expectation fail dfs (None where the
+    expectation passed) and the matching expectation types, in suite order.
+    If keep_expectation_type is given, only the expectations whose type
+    passes it are validated, in memory rather than through the checkpoint.
+    The checkpoint stores its results and updates the data docs only if
+    persist_results is True.
+    """
+    # GE evaluates a suite's expectations together, so they can only be
+    # profiled as a whole
+    if keep_expectation_type is None:
+        with profiled_stage("checkpoint", suite=expectation_suite_name):
+            a_checkpoint_result = _validate_datacontext(
+                context, DATASOURCE_NAME, expectation_suite_name, run_name,
+                inspectseq_df, persist_results)
+            results = _get_checkpoint_results(a_checkpoint_result)
+    else:
+        with profiled_stage("validator", suite=expectation_suite_name):
+            results = validate_expectation_subset(
+                context, DATASOURCE_NAME, expectation_suite_name, run_name,
+                inspectseq_df, keep_expectation_type)
+    with profiled_stage("result_fail_dfs", suite=expectation_suite_name):
+        result_fail_dfs = build_result_fail_dfs(inspectseq_df, results,
+                                                expectation_type)
+    return (result_fail_dfs,
+            [x.expectation_config.expectation_type for x in results])
+
+
+def generate_full_validation_df(context, expectation_suite_name,
+                                expectation_type, run_name, inspectseq_df,
+                                persist_results=False):
+    result_fail_dfs, _ = generate_result_fail_dfs(
+        context, expectation_suite_name, expectation_type, run_name,
+        inspectseq_df, persist_results=persist_results)
+    return concat_fail_dfs(result_fail_dfs)
+
+
+def project_subset_fail_dfs(generate_subset_fail_dfs, inspectseq_df,
+                            subset_mask, full_fail_dfs, expectation_types):
+    """Derive a row subset's per-expectation fail dfs from the full frame's.
+
+    Only the frame-level expectations are re-run, on the subset, by
+    generate_subset_fail_dfs(subset_df, keep_expectation_type), which returns
+    a generate_result_fail_dfs tuple.
+    """
+    subset_df = inspectseq_df[subset_mask].copy()
+    subset_df.reset_index(inplace=True, drop=True)
+    subset_frame_level_fail_dfs, _ = generate_subset_fail_dfs(
+        subset_df, lambda x: x in FRAME_LEVEL_EXPECTATION_TYPES)
+    return _project_validation_fail_dfs(
+        full_fail_dfs, expectation_types, subset_frame_level_fail_dfs,
+        inspectseq_df[subset_mask].index)
+
+
+def _parse_full_report_fname(report_fname):
+    fname_match = FULL_REPORT_FNAME_REGEX.match(report_fname)
+    if fname_match is None:
+        return None
+    return fname_match.group("df_kind") or "", fname_match.group("timestamp")
+
+
+def _list_full_report_fnames(report_path):
+    # just the names, without parsing or stat-ing the reports; sidecars
+    # (eg, *.fingerprints.npy) share the name root but don't match
+    return sorted(x.name for x in os.scandir(report_path)
+                  if FULL_REPORT_FNAME_ROOT in x.name and
+                  FULL_REPORT_FNAME_REGEX.match(x.name))
+
+
+def _get_listing_digest(report_fnames):
+    return hashlib.sha256("\n".join(report_fnames).encode("utf-8")) \
+        .hexdigest()
+
+
+def _read_report_manifest(manifest_path):
+    # returns the digest of the report listing the manifest was written
+    # for (None for a manifest from an older version, which has none) and
+    # df kind -> (timestamp, file name)
+    listing_digest = None
+    newest_entries = {}
+    with open(manifest_path, "r") as manifest_file:
+        for curr_line in manifest_file:
+            if not curr_line.strip():
+                continue
+            curr_fields = curr_line.rstrip("\n").split("\t")
+            if curr_fields[0] == MANIFEST_LISTING_KEY:
+                listing_digest = curr_fields[1]
+            else:
+                newest_entries[curr_fields[0]] = tuple(curr_fields[1:])
+    return listing_digest, newest_entries
+
+
+def _write_report_manifest(manifest_path, listing_digest, newest_entries):
+    with open(manifest_path, "w") as manifest_file:
+        manifest_file.write(f"{MANIFEST_LISTING_KEY}\t{listing_digest}\n")
+        manifest_file.writelines(f"{x}\t{y[0]}\t{y[1]}\n"
+                                 for x, y in sorted(newest_entries.items()))
+
+
+def _find_newest_reports(report_path, report_fnames):
+    # newest by the run timestamp in the file name; of reports with the
+    # same timestamp (eg, from a batch that runs files within a second),
+    # the last written wins, then the last by name.  Only those tied
+    # reports are stat-ed.
+    tied_fnames = {}
+    for curr_fname in report_fnames:
+        df_kind, timestamp = _parse_full_report_fname(curr_fname)
+        newest_timestamp = tied_fnames.get(df_kind, (None,))[0]
+        if newest_timestamp is None or timestamp > newest_timestamp:
+            tied_fnames[df_kind] = (timestamp, [curr_fname])
+        elif timestamp == newest_timestamp:
+            tied_fnames[df_kind][1].append(curr_fname)
+
+    newest_entries = {}
+    for df_kind, (timestamp, curr_fnames) in tied_fnames.items():
+        newest_fname = max(
+            curr_fnames,
+            key=lambda x: ((report_path / x).stat().st_mtime_ns, x))
+        newest_entries[df_kind] = (timestamp, newest_fname)
+    return newest_entries
+
+
+def _load_report_manifest(report_path):
+    """Return df kind -> (timestamp, file name) of the newest full validation
+    report of each kind in report_path.
+
+    The manifest is a tab-separated file in report_path with a line per df
+    kind, plus a digest of the names of the full reports it was built from.
+    It is used as long as those names haven't changed; if a full report
+    has been added (eg, copied in, or written by an older version) or
+    removed, it is rebuilt.  Other files in the directory don't matter.
+    """
+    manifest_path = report_path / REPORT_MANIFEST_FNAME
+    report_fnames = _list_full_report_fnames(report_path)
+    listing_digest = _get_listing_digest(report_fnames)
+    if manifest_path.exists():
+        manifest_digest, newest_entries = \
+            _read_report_manifest(manifest_path)
+        if manifest_digest == listing_digest:
+            return newest_entries
+
+    newest_entries = _find_newest_reports(report_path, report_fnames)
+    _write_report_manifest(manifest_path, listing_digest, newest_entries)
+    return newest_entries
+
+
+def record_report_in_manifest(report_fp):
+    # the new report changes the listing, so loading rebuilds the manifest
+    # with it included
+    if _parse_full_report_fname(report_fp.name) is not None:
+        _load_report_manifest(report_fp.parent)
+
+
+def get_latest_validation_report(report_path, df_kind=""):
+    newest_entry = _load_report_manifest(report_path).get(df_kind)
+    if newest_entry is None:
+        return None
+    return report_path / newest_entry[1]
+
+
+def load_validation_report(report_file):
+    report_path = pathlib.Path(report_file)
+    if report_path.stat().st_size == 0:
+        # an empty sentinel file: no issues were found
+        return pandas.DataFrame(columns=REPORT_KEY_COL_NAMES, dtype=object)
+
+    if report_path.suffix == ".parquet":
+        report_df = pandas.read_parquet(report_path)
+    elif report_path.suffix == ".feather":
+        report_df = pandas.read_feather(report_path)
+    else:
+        # read every field back as the string that was written, so that
+        # records compare (and fingerprint) the same as before being saved
+        return pandas.read_csv(report_path, na_values='',
+                               keep_default_na=False, dtype=str)
+
+    return report_df.astype(object)
+
+
+def _write_report_file(report_df, output_path):
+    if output_path.suffix == ".csv":
+        report_df.to_csv(output_path.absolute(), index=False)
+        return
+
+    # write every value as the string a csv report would hold, and the
+    # repeated columns as dictionary-encoded categoricals
+    columnar_df = report_df.reset_index(drop=True).astype(object)
+    columnar_df = columnar_df.apply(
+        lambda x: x.map(str, na_action="ignore"))
+    for curr_col_name in CONSTANT_REPORT_COL_NAMES:
+        columnar_df[curr_col_name] = \
+            columnar_df[curr_col_name].astype("category")
+
+    if output_path.suffix == ".parquet":
+        columnar_df.to_parquet(output_path.absolute(), index=False)
+    else:
+        columnar_df.to_feather(output_path.absolute())
+
+
+def fingerprint_report_records(report_df):
+    # a stable 64-bit hash of each record's key fields.  Empty strings are
+    # written out as empty fields, which read back as nulls, and nulls all
+    # hash alike, just as they all match each other in a merge.
+    key_df = report_df[REPORT_KEY_COL_NAMES].astype(object)
+    key_df = key_df.mask(key_df == "")
+    return pandas.util.hash_pandas_object(key_df, index=False).to_numpy()
+
+
+def _get_report_fingerprints(report_df):
+    """Return the sorted, distinct fingerprints of a report's records."""
+    return numpy.unique(fingerprint_report_records(report_df))
+
+
+def _get_fingerprints_path(report_path):
+    return report_path.with_name(report_path.name + FINGERPRINTS_FNAME_SUFFIX)
+
+
+def save_report_fingerprints(record_fingerprints, report_path):
+    """Save the sorted distinct record fingerprints (and their counts).
+
+    The sidecar sits next to the report, as a numpy structured array.
+    """
+    fingerprints, counts = numpy.unique(record_fingerprints,
+                                        return_counts=True)
+    fingerprint_records = numpy.empty(len(fingerprints),
+                                      dtype=FINGERPRINTS_DTYPE)
+    fingerprint_records["fingerprint"] = fingerprints
+    fingerprint_records["count"] = counts
+    with open(_get_fingerprints_path(report_path), "wb") as sidecar_file:
+        numpy.save(sidecar_file, fingerprint_records)
+    return fingerprints
+
+
+def load_report_fingerprints(report_file):
+    """Return the sorted distinct record fingerprints of a saved report.
+
+    Memory-maps the report's fingerprint sidecar if it has one, so only the
+    pages touched by the lookups are read; otherwise reads and fingerprints
+    the report itself.
+    """
+    fingerprints_path = _get_fingerprints_path(pathlib.Path(report_file))
+    if fingerprints_path.exists():
+        return numpy.load(fingerprints_path, mmap_mode="r")["fingerprint"]
+    return _get_report_fingerprints(load_validation_report(report_file))
+
+
+def select_new_records(latest_report_fingerprints, current_report_df):
+    current_fingerprints = fingerprint_report_records(current_report_df)
+    if len(latest_report_fingerprints) == 0:
+        return current_report_df.copy()
+
+    # membership test by binary search in the sorted previous fingerprints
+    positions = numpy.searchsorted(latest_report_fingerprints,
+                                   current_fingerprints)
+    positions[positions == len(latest_report_fingerprints)] = 0
+    is_old_record = \
+        latest_report_fingerprints[positions] == current_fingerprints
+    return current_report_df[~is_old_record].copy()
+
+
+def generate_differential_validation_df(latest_report_file, current_report_df,
+                                        report_fingerprints=None):
+    """Return the records of current_report_df not in the latest report.
+
+    report_fingerprints optionally maps the paths of reports written earlier
+    in the same run to their fingerprints, which are then used instead of
+    reading them back from disk.
+    """
+    latest_report_fingerprints = None
+    if report_fingerprints is not None:
+        latest_report_fingerprints = report_fingerprints.get(
+            pathlib.Path(latest_report_file))
+    if latest_report_fingerprints is None:
+        latest_report_fingerprints = \
+            load_report_fingerprints(latest_report_file)
+    return select_new_records(latest_report_fingerprints, current_report_df)
+
+
+def save_report_file(df_kind, report_df, report_type, output_path,
+                     save_fingerprints=False):
+    # returns the report's sorted distinct fingerprints, if saved
+    with profiled_stage("save_report", report=output_path.name,
+                        records=0 if report_df is None else len(report_df)):
+        if report_df is not None and len(report_df) > 0:
+            _write_report_file(report_df, output_path)
+            print(f"{report_type} {df_kind} detected and report saved")
+        else:
+            # create an empty file as a sentinel
+            output_path.touch()
+            print(f"No {report_type} {df_kind} detected")
+
+        if save_fingerprints:
+            return save_report_fingerprints(
+                numpy.empty(0, dtype="<u8") if report_df is None
+                else fingerprint_report_records(report_df), output_path)
+    return None
+
+
+def load_data_context():
+    # imported here rather than at the top of the module; see
+    # validate_expectation_subset
+    import great_expectations as ge
+    context = ge.data_context.DataContext()
+
+    # IDE marks these imports as not installed, but this appears to be a
+    # quirk of Great Expectations: they become installed ONLY AFTER the
+    # DataContext is instantiated--which is why they have to be imported here
+    # rather than at the top of the module as usual
+    from expectations.expect_column_values_gte_date import \
+        ExpectColumnValuesGteDate
+    from expectations.expect_column_values_lte_date import \
+        ExpectColumnValuesLteDate
+    from expectations.expect_table_columns_not_unnamed import \
+        ExpectTableColumnsNotUnnamed
+    from expectations.expect_column_values_to_parse_into_expected_locations \
+        import ExpectColumnValuesToParseIntoExpectedLocations
+    from expectations.expect_column_values_are_unique import \
+        ExpectColumnValuesAreUnique
+
+    return context
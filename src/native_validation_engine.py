@@ -0,0 +1,392 @@
+import json
+import operator
+import pathlib
+import re
+import sys
+from datetime import datetime
+
+import numpy
+import pandas
+
+from src.metadata_validation import build_column_fail_df, \
+    build_row_fail_df
+from src.run_profiling import profiled_stage
+
+GE_DIR_NAME = "great_expectations"
+NOW_PARAMETER = "now()"
+REGEX_SPECIAL_CHARS = set(".^$*+?{}[]\\|()")
+
+# (suite path, mtime in ns, size) -> parsed suite json, so that a batch of
+# metadata files (or the validation service) reads each suite once
+_native_suite_cache = {}
+
+
+def _find_ge_dir(search_start_dir=None):
+    # like the DataContext, look in the working directory and its parents
+    search_start_path = pathlib.Path(search_start_dir or pathlib.Path.cwd())
+    for curr_dir in [search_start_path] + list(search_start_path.parents):
+        ge_dir = curr_dir / GE_DIR_NAME
+        if (ge_dir / "expectations").is_dir():
+            return ge_dir
+    raise FileNotFoundError(f"No {GE_DIR_NAME} directory found in or above "
+                            f"{search_start_path}")
+
+
+_ge_dir = _find_ge_dir()
+
+# the plugin helpers don't need GE, but they live with the plugins, which GE
+# normally puts on the path when the DataContext is created
+if str(_ge_dir / "plugins") not in sys.path:
+    sys.path.append(str(_ge_dir / "plugins"))
+
+from expectations.column_datetime_parsing import \
+    compare_datetime_column, get_compare_date  # noqa E402
+from expectations.location_matching import compile_allowed_locations, \
+    load_allowed_locations, match_locations  # noqa E402
+
+
+def load_native_expectation_suite(expectation_suite_name):
+    """Return a suite's parsed json, shared while the file is unchanged.
+
+    Callers must not modify the suite they get back.
+    """
+    suite_fp = _ge_dir / "expectations" / f"{expectation_suite_name}.json"
+    suite_stat = suite_fp.stat()
+    cache_key = (str(suite_fp), suite_stat.st_mtime_ns, suite_stat.st_size)
+    a_suite = _native_suite_cache.get(cache_key)
+    if a_suite is not None:
+        return a_suite
+
+    with open(suite_fp, "r") as suite_file:
+        a_suite = json.load(suite_file)
+    # drop stale versions of the same file
+    for curr_key in [x for x in _native_suite_cache if x[0] == str(suite_fp)]:
+        _native_suite_cache.pop(curr_key)
+    _native_suite_cache[cache_key] = a_suite
+    return a_suite
+
+
+def get_native_expectation_configs(expectation_suite_name):
+    """Return (expectation type, kwargs) for each of a suite's expectations."""
+    a_suite = load_native_expectation_suite(expectation_suite_name)
+    return [(x["expectation_type"], x["kwargs"])
+            for x in a_suite["expectations"]]
+
+
+def _resolve_parameter(value):
+    # the suites use only the now() evaluation parameter; GE hands it to the
+    # expectation as an isoformat string
+    if isinstance(value, dict) and "$PARAMETER" in value:
+        if value["$PARAMETER"] != NOW_PARAMETER:
+            raise ValueError(f"unsupported evaluation parameter "
+                             f"{value['$PARAMETER']}")
+        return datetime.now().isoformat()
+    return value
+
+
+def _check_columns_match_set(a_dataframe, column_set, exact_match=True,
+                             **kwargs):
+    expected_set = set(column_set)
+    actual_set = set(a_dataframe.columns)
+    mismatched = {}
+    if expected_set - actual_set:
+        mismatched["missing"] = sorted(expected_set - actual_set)
+    if actual_set - expected_set:
+        mismatched["unexpected"] = sorted(actual_set - expected_set)
+
+    if "missing" in mismatched:
+        return "missing", mismatched["missing"]
+    if exact_match and "unexpected" in mismatched:
+        return "unexpected", mismatched["unexpected"]
+    return None
+
+
+def _check_columns_not_unnamed(a_dataframe, exception_num=0, **kwargs):
+    unnamed_cols = [x for x in a_dataframe.columns
+                    if x.startswith("Unnamed")]
+    if len(unnamed_cols) <= int(exception_num):
+        return None
+    return "unexpected", sorted(unnamed_cols)[exception_num:]
+
+
+def _split_literal_prefixes(regex_list):
+    # "^" plus plain characters only matches values starting with those
+    # characters, which a hashed lookup of each value's prefix can test
+    literal_prefixes = {}
+    other_regexes = []
+    for curr_regex in regex_list:
+        curr_body = curr_regex[1:]
+        if curr_regex.startswith("^") and len(curr_body) > 0 and \
+                not any(x in REGEX_SPECIAL_CHARS for x in curr_body):
+            literal_prefixes.setdefault(len(curr_body), set()).add(curr_body)
+        else:
+            other_regexes.append(curr_regex)
+    return literal_prefixes, other_regexes
+
+
+def _combine_regexes(regex_list):
+    # one alternation searches each value once rather than once per regex;
+    # numbered or named backreferences would break when combined
+    if len(regex_list) > 1 and \
+            not any(re.search(r"\\\d|\(\?P[<=]", x) for x in regex_list):
+        combined_regex = "|".join(f"(?:{x})" for x in regex_list)
+        try:
+            re.compile(combined_regex)
+            return [combined_regex]
+        except re.error:
+            pass
+    return regex_list
+
+
+def _match_regexes(column, regex_list):
+    # values repeat (zips) or are tested by several regexes, so test each
+    # distinct value once and broadcast the outcome to the rows by code
+    codes, unique_strs = pandas.factorize(column.astype(str))
+    unique_strs = pandas.Series(unique_strs, dtype=object)
+
+    unique_matches = numpy.zeros(len(unique_strs), dtype=bool)
+    literal_prefixes, other_regexes = _split_literal_prefixes(regex_list)
+    for curr_length, curr_prefixes in literal_prefixes.items():
+        unique_matches |= unique_strs.str.slice(0, curr_length).isin(
+            curr_prefixes).to_numpy(dtype=bool)
+    for curr_regex in _combine_regexes(other_regexes):
+        unique_matches |= unique_strs.str.contains(curr_regex).to_numpy(
+            dtype=bool)
+
+    # nulls (code -1) are filtered out before any check sees the column
+    return numpy.append(unique_matches, False).take(codes)
+
+
+def _check_values_match_regex(column, regex, **kwargs):
+    return _match_regexes(column, [regex])
+
+
+def _check_values_match_regex_list(column, regex_list, match_on="any",
+                                   **kwargs):
+    if match_on != "any":
+        raise ValueError(f"unsupported match_on value {match_on}")
+    return _match_regexes(column, regex_list)
+
+
+def _check_values_not_match_regex_list(column, regex_list, **kwargs):
+    return ~_match_regexes(column, regex_list)
+
+
+def _check_values_in_set(column, value_set, **kwargs):
+    # these columns have few distinct values, so test each category (or
+    # distinct value) once and broadcast the outcome to the rows by code
+    if isinstance(column.dtype, pandas.CategoricalDtype):
+        codes = column.cat.codes.to_numpy()
+        categories = column.cat.categories
+    else:
+        codes, categories = pandas.factorize(column)
+    category_results = numpy.asarray(categories.isin(value_set), dtype=bool)
+    # nulls (code -1) are filtered out before any check sees the column, so
+    # this trailing entry is never actually picked up
+    return numpy.append(category_results, False).take(codes)
+
+
+def _check_values_between(column, min_value=None, max_value=None,
+                          strict_min=False, strict_max=False, **kwargs):
+    results = numpy.ones(len(column), dtype=bool)
+    if min_value is not None:
+        min_compare = operator.gt if strict_min else operator.ge
+        results &= min_compare(column, min_value).to_numpy(dtype=bool)
+    if max_value is not None:
+        max_compare = operator.lt if strict_max else operator.le
+        results &= max_compare(column, max_value).to_numpy(dtype=bool)
+    return results
+
+
+def _get_comparison_types(type_list):
+    # the same type lookups as GE's in-type-list metric
+    comparison_types = []
+    for curr_type in type_list:
+        try:
+            comparison_types.append(numpy.dtype(curr_type).type)
+        except TypeError:
+            for curr_module in [pandas, pandas.core.dtypes.dtypes]:
+                pandas_type = getattr(curr_module, curr_type, None)
+                if isinstance(pandas_type, type):
+                    comparison_types.append(pandas_type)
+
+        native_type = {
+            "none": (type(None),), "bool": (bool,), "int": (int,),
+            "long": (int,), "float": (float,), "bytes": (bytes,),
+            "complex": (complex,), "str": (str,), "string_types": (str,),
+            "list": (list,), "dict": (dict,)}.get(curr_type.lower())
+        if native_type is not None:
+            comparison_types.extend(native_type)
+    return comparison_types
+
+
+def _check_values_in_type_list(column, type_list, **kwargs):
+    comparison_types = tuple(_get_comparison_types(type_list))
+    if len(comparison_types) < 1:
+        raise ValueError(f"No recognized types in type_list {type_list}")
+
+    return numpy.fromiter((isinstance(x, comparison_types) for x in column),
+                          dtype=bool, count=len(column))
+
+
+def _check_values_gte_date(column, min_value, dates_have_tz=True, **kwargs):
+    compare_date = get_compare_date(min_value, dates_have_tz)
+    return compare_datetime_column(column, compare_date, operator.ge) \
+        .to_numpy(dtype=bool)
+
+
+def _check_values_lte_date(column, max_value, dates_have_tz=True, **kwargs):
+    compare_date = get_compare_date(max_value, dates_have_tz)
+    return compare_datetime_column(column, compare_date, operator.le) \
+        .to_numpy(dtype=bool)
+
+
+def _check_values_unique(column, **kwargs):
+    return ~column.duplicated(keep=False).to_numpy(dtype=bool)
+
+
+def _check_values_in_expected_locations(column, allowed_locations_abs_fp,
+                                        **kwargs):
+    if type(allowed_locations_abs_fp) == dict:
+        allowed_paths = compile_allowed_locations(allowed_locations_abs_fp)
+    else:
+        _, allowed_paths = load_allowed_locations(allowed_locations_abs_fp)
+    return match_locations(column, allowed_paths).to_numpy(dtype=bool)
+
+
+TABLE_CHECKS = {
+    "expect_table_columns_to_match_set": _check_columns_match_set,
+    "expect_table_columns_not_unnamed": _check_columns_not_unnamed,
+}
+
+# expectation type -> (check, whether the check sees the null values too)
+COLUMN_MAP_CHECKS = {
+    "expect_column_values_to_not_be_null": (None, True),
+    "expect_column_values_are_unique": (_check_values_unique, False),
+    "expect_column_values_to_match_regex": (_check_values_match_regex, False),
+    "expect_column_values_to_match_regex_list":
+        (_check_values_match_regex_list, False),
+    "expect_column_values_to_not_match_regex_list":
+        (_check_values_not_match_regex_list, False),
+    "expect_column_values_to_be_in_set": (_check_values_in_set, False),
+    "expect_column_values_to_be_between": (_check_values_between, False),
+    "expect_column_values_to_be_in_type_list":
+        (_check_values_in_type_list, False),
+    "expect_column_values_gte_date": (_check_values_gte_date, False),
+    "expect_column_values_lte_date": (_check_values_lte_date, False),
+    "expect_column_values_to_parse_into_expected_locations":
+        (_check_values_in_expected_locations, False),
+}
+
+
+def _get_domain_mask(a_dataframe, column_name, row_condition, include_nulls):
+    domain_mask = numpy.ones(len(a_dataframe), dtype=bool)
+    if row_condition is not None:
+        domain_mask &= a_dataframe.index.isin(
+            a_dataframe.query(row_condition, engine="python").index)
+    if not include_nulls:
+        domain_mask &= a_dataframe[column_name].notna().to_numpy()
+    return domain_mask
+
+
+def _evaluate_column_map(a_dataframe, expectation_type, kwargs):
+    check_func, include_nulls = COLUMN_MAP_CHECKS[expectation_type]
+    column_name = kwargs["column"]
+    column = a_dataframe[column_name]
+    domain_mask = _get_domain_mask(a_dataframe, column_name,
+                                   kwargs.get("row_condition"), include_nulls)
+
+    if expectation_type == "expect_column_values_to_be_in_type_list" and \
+            column.dtype != object:
+        # like GE, a typed column passes or fails as a whole, on its dtype
+        if column.dtype.type in _get_comparison_types(kwargs["type_list"]):
+            return None
+        raise ValueError(f"unrecognized outputs for expectation "
+                         f"{expectation_type}")
+
+    domain_column = column[domain_mask]
+    try:
+        if check_func is None:
+            passed_mask = domain_column.notna().to_numpy()
+        else:
+            passed_mask = check_func(domain_column, **{
+                x: y for x, y in kwargs.items()
+                if x not in ("column", "row_condition", "mostly")})
+    except (TypeError, ValueError, OverflowError, OSError) as ex:
+        # GE catches these (eg, comparing strings to numbers, unparseable
+        # dates, a missing locations file) and reports them as the
+        # expectation's exception info
+        print(f"Validation failed: {expectation_type} on {column_name}: "
+              f"{ex}")
+        return None
+
+    fail_positions = numpy.flatnonzero(domain_mask)[~passed_mask]
+    if len(fail_positions) == 0:
+        return None
+
+    mostly = kwargs.get("mostly")
+    if mostly is not None and \
+            1 - len(fail_positions) / len(domain_column) >= mostly:
+        return None
+    return fail_positions
+
+
+def generate_native_result_fail_df(a_dataframe, expectation_type, kwargs,
+                                   expectation_suite_type):
+    kwargs = {x: _resolve_parameter(y) for x, y in kwargs.items()
+              if x not in ("result_format", "condition_parser")}
+
+    if expectation_type in TABLE_CHECKS:
+        table_outcome = TABLE_CHECKS[expectation_type](a_dataframe, **kwargs)
+        if table_outcome is None:
+            return None
+        fail_key, fail_cols = table_outcome
+        return build_column_fail_df(fail_key, fail_cols, expectation_type,
+                                    expectation_suite_type)
+
+    if expectation_type not in COLUMN_MAP_CHECKS:
+        raise ValueError(f"expectation type {expectation_type} is not "
+                         f"supported by the native engine")
+
+    fail_positions = _evaluate_column_map(a_dataframe, expectation_type,
+                                          kwargs)
+    if fail_positions is None:
+        return None
+    column_name = kwargs["column"]
+    fail_values = \
+        a_dataframe[column_name].iloc[fail_positions].to_numpy(dtype=object)
+    return build_row_fail_df(a_dataframe, column_name, fail_positions,
+                             fail_values, expectation_type,
+                             expectation_suite_type)
+
+
+def generate_native_result_fail_dfs(expectation_suite_name,
+                                    expectation_suite_type, inspectseq_df,
+                                    keep_expectation_type=None):
+    """Evaluate a suite's expectations directly on inspectseq_df, without GE.
+
+    Returns the same (per-expectation fail dfs, expectation types) tuple as
+    generate_result_fail_dfs, for the expectations whose type passes
+    keep_expectation_type (all of them, by default).
+    """
+    a_suite = load_native_expectation_suite(expectation_suite_name)
+
+    result_fail_dfs = []
+    expectation_types = []
+    for expectation_index, curr_expectation in enumerate(
+            a_suite["expectations"]):
+        curr_type = curr_expectation["expectation_type"]
+        if keep_expectation_type is not None and \
+                not keep_expectation_type(curr_type):
+            continue
+
+        with profiled_stage(
+                "expectation", suite=expectation_suite_name,
+                index=expectation_index, expectation_type=curr_type,
+                column=curr_expectation["kwargs"].get("column")):
+            result_fail_dfs.append(generate_native_result_fail_df(
+                inspectseq_df, curr_type, curr_expectation["kwargs"],
+                expectation_suite_type))
+        expectation_types.append(curr_type)
+
+    return result_fail_dfs, expectation_types
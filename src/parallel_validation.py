@@ -0,0 +1,141 @@
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy
+
+from src.metadata_validation import DATASOURCE_NAME, \
+    FRAME_LEVEL_EXPECTATION_TYPES, SAMPLE_DATETIME_COL_NAME, \
+    build_result_fail_dfs, concat_fail_dfs, generate_result_fail_dfs, \
+    get_suite_expectation_configs, load_data_context, \
+    suite_supports_projection, validate_expectation_subset
+
+# each worker (process or thread) loads its own DataContext, once, since a
+# DataContext can't be shared between threads
+_worker_state = threading.local()
+
+
+def _initialize_worker():
+    _worker_state.context = load_data_context()
+
+
+def _is_row_local(expectation_type):
+    return expectation_type not in FRAME_LEVEL_EXPECTATION_TYPES
+
+
+def _validate_shard(expectation_suite_name, expectation_type, run_name,
+                    shard_df):
+    from expectations.column_datetime_parsing import \
+        parsed_datetime_columns_cached
+
+    with parsed_datetime_columns_cached(shard_df, [SAMPLE_DATETIME_COL_NAME]):
+        shard_results = validate_expectation_subset(
+            _worker_state.context, DATASOURCE_NAME, expectation_suite_name,
+            run_name, shard_df, _is_row_local)
+        return build_result_fail_dfs(shard_df, shard_results,
+                                     expectation_type)
+
+
+def _validate_suite(expectation_suite_name, expectation_type, run_name,
+                    inspectseq_df):
+    from expectations.column_datetime_parsing import \
+        parsed_datetime_columns_cached
+
+    # validator rather than checkpoint, so that concurrent jobs never write
+    # to the same checkpoint or validation stores.  In a thread the run's
+    # parse of the full frame is already cached, so this adds nothing; a
+    # process has its own (empty) cache to fill.
+    with parsed_datetime_columns_cached(inspectseq_df,
+                                        [SAMPLE_DATETIME_COL_NAME]):
+        results = validate_expectation_subset(
+            _worker_state.context, DATASOURCE_NAME, expectation_suite_name,
+            run_name, inspectseq_df, lambda x: True)
+        return (build_result_fail_dfs(inspectseq_df, results,
+                                      expectation_type),
+                [x.expectation_config.expectation_type for x in results])
+
+
+def create_suite_executor(executor_kind, num_jobs):
+    executor_class = ThreadPoolExecutor if executor_kind == "thread" \
+        else ProcessPoolExecutor
+    return executor_class(max_workers=num_jobs,
+                          initializer=_initialize_worker)
+
+
+def generate_concurrent_result_fail_dfs(executor, validation_jobs):
+    """Run each (suite name, suite type, run name, frame) job in executor.
+
+    Returns the generate_result_fail_dfs tuple for each job, in job order.
+    """
+    job_futures = [executor.submit(_validate_suite, *x)
+                   for x in validation_jobs]
+    return [x.result() for x in job_futures]
+
+
+def create_shard_executor(num_workers):
+    return ProcessPoolExecutor(max_workers=num_workers,
+                               initializer=_initialize_worker)
+
+
+def generate_sharded_result_fail_dfs(executor, context, expectation_suite_name,
+                                     expectation_type, run_name,
+                                     inspectseq_df, num_shards):
+    """Validate inspectseq_df in row shards across a process pool.
+
+    The row-local expectations run on each shard in a worker; the
+    frame-level ones run once, here, on the whole frame.  Returns the same
+    (per-expectation fail dfs, expectation types) tuple as
+    generate_result_fail_dfs, with row labels mapped back to inspectseq_df.
+    A suite with 'mostly' thresholds is validated unsharded, since whether
+    a threshold is met depends on all of the rows.
+    """
+    if not suite_supports_projection(
+            get_suite_expectation_configs(context, expectation_suite_name)):
+        print(f"Suite {expectation_suite_name} uses 'mostly' thresholds, so "
+              f"it can't be validated in shards; validating it whole "
+              f"instead")
+        return generate_result_fail_dfs(
+            context, expectation_suite_name, expectation_type, run_name,
+            inspectseq_df)
+
+    shard_bounds = [(x[0], x[-1] + 1) for x in numpy.array_split(
+        numpy.arange(len(inspectseq_df)), num_shards) if len(x) > 0]
+
+    shard_futures = []
+    for shard_start, shard_stop in shard_bounds:
+        # unexpected indices are resolved positionally, so each shard
+        # needs its own zero-based index
+        shard_df = inspectseq_df.iloc[shard_start:shard_stop].copy()
+        shard_df.reset_index(inplace=True, drop=True)
+        shard_futures.append(executor.submit(
+            _validate_shard, expectation_suite_name, expectation_type,
+            f"{run_name}_shard{shard_start}", shard_df))
+
+    frame_level_results = validate_expectation_subset(
+        context, DATASOURCE_NAME, expectation_suite_name, run_name,
+        inspectseq_df, lambda x: not _is_row_local(x))
+    frame_level_fail_dfs = iter(build_result_fail_dfs(
+        inspectseq_df, frame_level_results, expectation_type))
+
+    shard_fail_dfs = []
+    for (shard_start, _), curr_future in zip(shard_bounds, shard_futures):
+        curr_shard_fail_dfs = curr_future.result()
+        for curr_fail_df in curr_shard_fail_dfs:
+            if curr_fail_df is not None:
+                curr_fail_df.index = \
+                    inspectseq_df.index[curr_fail_df.index + shard_start]
+        shard_fail_dfs.append(iter(curr_shard_fail_dfs))
+
+    # stitch each row-local expectation's failures back together in shard
+    # (and therefore row) order, keeping the suite's expectation order
+    expectation_types = [
+        x.expectation_type for x in
+        context.get_expectation_suite(expectation_suite_name).expectations]
+    result_fail_dfs = []
+    for curr_type in expectation_types:
+        if _is_row_local(curr_type):
+            result_fail_dfs.append(concat_fail_dfs(
+                [next(x) for x in shard_fail_dfs]))
+        else:
+            result_fail_dfs.append(next(frame_level_fail_dfs))
+
+    return result_fail_dfs, expectation_types
@@ -0,0 +1,147 @@
+import contextlib
+import cProfile
+import json
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, where peak RSS is simply not recorded
+    resource = None
+
+RUN_PROFILE_FNAME_ROOT = "_run_profile_"
+
+# the profile of the run in progress, if any; profiled_stage is a no-op
+# without one
+_active_profile = None
+
+
+def _get_max_rss_bytes():
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # reported in bytes on macOS but in kilobytes elsewhere
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class RunProfile:
+    """Wall time, CPU time and memory use of the stages of a report run.
+
+    Stages can nest; each stage's record holds its own totals, which include
+    those of the stages inside it.  Memory is tracked with tracemalloc, so
+    each record has the net change in traced memory over the stage and the
+    peak above its starting level, as well as the process's peak RSS at its
+    end (a high-water mark for the whole process, so it only grows).
+    """
+
+    def __init__(self):
+        self.stage_records = []
+        # running tracemalloc peak of each open stage, innermost last
+        self._open_stage_peaks = []
+
+    def _fold_peak(self):
+        # tracemalloc has one peak, which each stage resets, so carry it
+        # into the enclosing stage's running peak before it is lost
+        if self._open_stage_peaks:
+            self._open_stage_peaks[-1] = max(
+                self._open_stage_peaks[-1], tracemalloc.get_traced_memory()[1])
+
+    @contextlib.contextmanager
+    def stage(self, stage_name, **labels):
+        stage_record = {"stage": stage_name, **labels,
+                        "depth": len(self._open_stage_peaks)}
+        # recorded in the order the stages start
+        self.stage_records.append(stage_record)
+
+        self._fold_peak()
+        tracemalloc.reset_peak()
+        start_traced = tracemalloc.get_traced_memory()[0]
+        self._open_stage_peaks.append(start_traced)
+        start_max_rss = _get_max_rss_bytes()
+        start_cpu_time = time.process_time()
+        start_wall_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_seconds = time.perf_counter() - start_wall_time
+            cpu_seconds = time.process_time() - start_cpu_time
+            self._fold_peak()
+            stage_peak = self._open_stage_peaks.pop()
+            end_traced = tracemalloc.get_traced_memory()[0]
+            end_max_rss = _get_max_rss_bytes()
+            stage_record.update({
+                "wall_seconds": wall_seconds,
+                "cpu_seconds": cpu_seconds,
+                "tracemalloc_delta_bytes": end_traced - start_traced,
+                "tracemalloc_peak_bytes": stage_peak - start_traced,
+                "max_rss_bytes": end_max_rss,
+                "max_rss_increase_bytes": None if end_max_rss is None
+                else end_max_rss - start_max_rss})
+
+            # the enclosing stage's peak includes this one's
+            if self._open_stage_peaks:
+                self._open_stage_peaks[-1] = max(
+                    self._open_stage_peaks[-1], stage_peak)
+            tracemalloc.reset_peak()
+
+
+@contextlib.contextmanager
+def profiled_stage(stage_name, **labels):
+    """Record a stage of the run in the active run profile, if there is one.
+
+    labels (eg, the suite name) are saved with the stage's record.  Stages
+    in other threads (eg, of --concurrent-suites) are not recorded, since
+    they would overlap those of the main thread.
+    """
+    if _active_profile is None or \
+            threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    with _active_profile.stage(stage_name, **labels):
+        yield
+
+
+@contextlib.contextmanager
+def profiled_run(profile_path, run_info, pstats_path=None):
+    """Profile the stages of a report run and save them as json.
+
+    The whole run is recorded as the "run" stage.  run_info (eg, the
+    arguments) is saved with the stage records.  If pstats_path is given,
+    the run is also profiled with cProfile and its stats dumped there.
+    """
+    global _active_profile
+    if _active_profile is not None:
+        raise ValueError("A run profile is already active")
+
+    a_profile = RunProfile()
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    function_profiler = cProfile.Profile() if pstats_path else None
+
+    _active_profile = a_profile
+    try:
+        if function_profiler is not None:
+            function_profiler.enable()
+        try:
+            with a_profile.stage("run"):
+                yield a_profile
+        finally:
+            if function_profiler is not None:
+                function_profiler.disable()
+    finally:
+        _active_profile = None
+        if not was_tracing:
+            tracemalloc.stop()
+
+    with open(profile_path, "w") as profile_file:
+        json.dump({**run_info, "stages": a_profile.stage_records},
+                  profile_file, indent=2, default=str)
+    print(f"Run profile saved to {profile_path}")
+    if function_profiler is not None:
+        function_profiler.dump_stats(pstats_path)
+        print(f"cProfile stats saved to {pstats_path}")
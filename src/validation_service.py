@@ -0,0 +1,168 @@
+import argparse
+import contextlib
+import hmac
+import http.server
+import io
+import json
+import os
+import secrets
+import traceback
+from sys import argv
+
+from src.generate_metadata_validation_report import \
+    generate_failure_and_warning_reports, load_validation_engine
+from src.validation_service_client import DEFAULT_HOST, DEFAULT_PORT, \
+    JOBS_PATH, JSON_CONTENT_TYPE, STATUS_PATH, TOKEN_HEADER_NAME, \
+    get_service_token_path
+
+REPORTS_PROG_NAME = "generate_metadata_reports"
+
+
+def run_validation_job(arguments, working_dir, engines):
+    """Run generate_metadata_reports with the given arguments, in-process.
+
+    Relative paths in the arguments are taken relative to working_dir.
+    engines caches the loaded validation engines between jobs.  Returns the
+    exit code and everything the run printed.
+    """
+    output = io.StringIO()
+    exit_code = 0
+    with contextlib.redirect_stdout(output), \
+            contextlib.redirect_stderr(output):
+        try:
+            generate_failure_and_warning_reports(
+                [REPORTS_PROG_NAME] + list(arguments), engines, working_dir)
+        except SystemExit as ex:
+            # eg, argument errors
+            exit_code = ex.code if isinstance(ex.code, int) else 1
+        except Exception:
+            traceback.print_exc()
+            exit_code = 1
+    return exit_code, output.getvalue()
+
+
+class _ValidationJobHandler(http.server.BaseHTTPRequestHandler):
+    def _send_json(self, status_code, response_dict):
+        response_bytes = json.dumps(response_dict).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(response_bytes)))
+        self.end_headers()
+        self.wfile.write(response_bytes)
+
+    def do_GET(self):
+        if self.path != STATUS_PATH:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        self._send_json(200, {"status": "ready", "pid": os.getpid(),
+                              "jobs_run": self.server.jobs_run,
+                              "engines": sorted(
+                                  x[0] for x in self.server.engines)})
+
+    def do_POST(self):
+        if self.path != JOBS_PATH:
+            self._send_json(404, {"error": f"unknown path {self.path}"})
+            return
+
+        if not hmac.compare_digest(
+                self.headers.get(TOKEN_HEADER_NAME, "").encode("utf-8"),
+                self.server.token.encode("utf-8")):
+            self._send_json(403, {"error": "missing or wrong service token"})
+            return
+        if self.headers.get_content_type() != JSON_CONTENT_TYPE:
+            self._send_json(415, {"error": f"jobs must be sent as "
+                                           f"{JSON_CONTENT_TYPE}"})
+            return
+
+        try:
+            job = json.loads(self.rfile.read(
+                int(self.headers.get("Content-Length", 0))))
+            arguments = job["arguments"]
+            working_dir = job["working_dir"]
+        except (ValueError, KeyError, TypeError) as ex:
+            self._send_json(400, {"error": f"malformed job: {ex}"})
+            return
+
+        # the server handles one request at a time, so jobs run serially
+        exit_code, output = run_validation_job(
+            arguments, working_dir, self.server.engines)
+        self.server.jobs_run += 1
+        self._send_json(200, {"exit_code": exit_code, "output": output})
+
+
+def _write_service_token(port):
+    # readable by this user only; replaced by each service started on port
+    token_path = get_service_token_path(port)
+    token_path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    token = secrets.token_urlsafe(32)
+    token_fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                       0o600)
+    # the mode above applies only if the file is new
+    os.fchmod(token_fd, 0o600)
+    with os.fdopen(token_fd, "w") as token_file:
+        token_file.write(token)
+    return token_path, token
+
+
+def serve_validation_jobs(host=DEFAULT_HOST, port=DEFAULT_PORT,
+                          preload_engine_names=("ge",)):
+    """Serve validation jobs over HTTP until interrupted.
+
+    The engines named are loaded up front; the server must be started in
+    (or below) the folder holding the great_expectations directory.  Jobs
+    are accepted only with the token written to get_service_token_path(port)
+    at startup, which only the user running the service can read.
+    """
+    engines = {}
+    for curr_engine_name in preload_engine_names:
+        print(f"Loading the {curr_engine_name} validation engine")
+        engine_args = argparse.Namespace(engine=curr_engine_name,
+                                         persist_results=False)
+        engines[(curr_engine_name, False)] = \
+            load_validation_engine(engine_args)
+
+    with http.server.HTTPServer((host, port), _ValidationJobHandler) as \
+            server:
+        server.engines = engines
+        server.jobs_run = 0
+        token_path, server.token = _write_service_token(port)
+        print(f"Validation service listening on http://{host}:{port}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("Validation service stopped")
+        finally:
+            token_path.unlink(missing_ok=True)
+
+
+def _parse_arguments(arg_list):
+    parser = argparse.ArgumentParser(
+        prog="serve_metadata_reports",
+        description="Keep the validator loaded and run "
+                    "generate_metadata_reports jobs sent with its --service "
+                    "option.  Start it from the inspectseq_metadata_validator "
+                    "folder.")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help=f"address to listen on (default: {DEFAULT_HOST}; "
+                             f"jobs need the token the service writes to a "
+                             f"file in the user's home directory, so clients "
+                             f"must run as the same user on the same "
+                             f"machine)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                        help=f"port to listen on (default: {DEFAULT_PORT})")
+    parser.add_argument("--engine", nargs="+", choices=["ge", "native"],
+                        default=["ge"], dest="engine_names",
+                        help="validation engine(s) to load at startup "
+                             "(default: ge); others are loaded by the first "
+                             "job that needs them")
+    return parser.parse_args(arg_list[1:])
+
+
+def main():
+    args = _parse_arguments(argv)
+    serve_validation_jobs(args.host, args.port, args.engine_names)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+import json
+import os
+import pathlib
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+JOBS_PATH = "/jobs"
+STATUS_PATH = "/status"
+JSON_CONTENT_TYPE = "application/json"
+# jobs must carry the token the service wrote to a file only its user can
+# read, so that only that user can submit them
+TOKEN_HEADER_NAME = "X-Validation-Service-Token"
+TOKEN_DIR_NAME = ".inspectseq_metadata_validator"
+
+
+def get_service_token_path(port):
+    return pathlib.Path.home() / TOKEN_DIR_NAME / f"service_{port}.token"
+
+
+def _read_service_token(service_url):
+    # a url without a port is served on http's default one
+    port = urllib.parse.urlsplit(service_url).port or 80
+    token_path = get_service_token_path(port)
+    try:
+        return token_path.read_text().strip()
+    except OSError as ex:
+        raise ConnectionError(f"Could not read the validation service's "
+                              f"token from {token_path} (is the service "
+                              f"running, as this user?): {ex}") from ex
+
+
+def submit_validation_job(service_url, arguments):
+    """Run generate_metadata_reports with these arguments in a service.
+
+    Prints the run's output and returns its exit code.
+    """
+    job_bytes = json.dumps({"arguments": list(arguments),
+                            "working_dir": os.getcwd()}).encode("utf-8")
+    request = urllib.request.Request(
+        service_url.rstrip("/") + JOBS_PATH, data=job_bytes,
+        headers={"Content-Type": JSON_CONTENT_TYPE,
+                 TOKEN_HEADER_NAME: _read_service_token(service_url)},
+        method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            job_result = json.load(response)
+    except urllib.error.HTTPError as ex:
+        # the service responded, but refused the job; its body says why
+        raise RuntimeError(f"The validation service at {service_url} "
+                           f"rejected the job ({ex.code} {ex.reason}): "
+                           f"{ex.read().decode('utf-8', 'replace')}") \
+            from ex
+    except urllib.error.URLError as ex:
+        raise ConnectionError(f"Could not submit the job to the validation "
+                              f"service at {service_url}: {ex}") from ex
+
+    print(job_result["output"], end="")
+    return job_result["exit_code"]
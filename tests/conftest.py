@@ -0,0 +1,52 @@
+import json
+import pathlib
+import shutil
+
+import pytest
+
+from src.metadata_validation import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME
+
+REPO_DIR = pathlib.Path(__file__).resolve().parent.parent
+LOCATIONS_EXPECTATION_TYPE = \
+    "expect_column_values_to_parse_into_expected_locations"
+ALLOWED_LOCATIONS_YAML = """\
+North America:
+  USA:
+    California:
+      Los Angeles: {}
+      San Diego: {}
+"""
+
+
+@pytest.fixture
+def allowed_locations_fp(tmp_path):
+    allowed_locations_fp = tmp_path / "locations.yaml"
+    allowed_locations_fp.write_text(ALLOWED_LOCATIONS_YAML)
+    return allowed_locations_fp
+
+
+@pytest.fixture
+def located_ge_dir(tmp_path, allowed_locations_fp):
+    """Return a copy of the great_expectations directory in tmp_path.
+
+    Its suites are the shipped ones, but check locations against
+    allowed_locations_fp rather than the shipped placeholder path.  The
+    DataContext finds it from tmp_path; the native engine needs its _ge_dir
+    pointed at it.
+    """
+    ge_dir = tmp_path / "great_expectations"
+    shutil.copytree(REPO_DIR / "great_expectations", ge_dir,
+                    ignore=shutil.ignore_patterns("uncommitted",
+                                                  "__pycache__"))
+    for curr_suite_name in [DEFAULT_FAIL_EXPECT_SUITE_NAME,
+                            DEFAULT_WARN_EXPECT_SUITE_NAME]:
+        suite_fp = ge_dir / "expectations" / f"{curr_suite_name}.json"
+        a_suite = json.loads(suite_fp.read_text())
+        for curr_expectation in a_suite["expectations"]:
+            if curr_expectation["expectation_type"] == \
+                    LOCATIONS_EXPECTATION_TYPE:
+                curr_expectation["kwargs"]["allowed_locations_abs_fp"] = \
+                    str(allowed_locations_fp)
+        suite_fp.write_text(json.dumps(a_suite))
+    return ge_dir
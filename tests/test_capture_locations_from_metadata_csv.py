@@ -0,0 +1,30 @@
+import yaml
+
+from src.capture_locations_from_metadata_csv import \
+    generate_unique_locations_yaml
+
+METADATA_CSV = """\
+search_id,sample_collection_location
+SEARCH-10000,North America/USA/California/San Diego
+SEARCH-10001,North America/USA/Nevada/Clark County
+SEARCH-10002,
+"""
+
+
+def test_merge_descends_into_valueless_yaml_keys(tmp_path):
+    metadata_fp = tmp_path / "all_samples_search_ids_20220102.csv"
+    metadata_fp.write_text(METADATA_CSV)
+    # "California:" and "Nevada:" load as None
+    base_yaml_fp = tmp_path / "base.yaml"
+    base_yaml_fp.write_text("North America:\n  USA:\n    California:\n"
+                            "    Nevada:\n  Mexico:\n")
+    output_fp = tmp_path / "locations.yaml"
+
+    generate_unique_locations_yaml(metadata_fp, output_fp, base_yaml_fp)
+
+    with open(output_fp) as output_file:
+        assert yaml.safe_load(output_file) == {
+            "North America": {
+                "USA": {"California": {"San Diego": {}},
+                        "Nevada": {"Clark County": {}}},
+                "Mexico": None}}
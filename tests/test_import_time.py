@@ -0,0 +1,69 @@
+import http.server
+import json
+import os
+import threading
+
+import pytest
+
+from benchmarks.check_import_time import check_entry_point_import_time
+from src.validation_service_client import DEFAULT_HOST, JSON_CONTENT_TYPE, \
+    get_service_token_path
+
+HEAVY_MODULE_NAMES = ["great_expectations", "pandas", "numpy"]
+# -X importtime total; generous, since these take about a tenth of that,
+# and importing great_expectations alone takes seconds
+MAX_IMPORT_SECONDS = 1.0
+
+
+@pytest.mark.parametrize("entry_point_name", ["generate_metadata_reports",
+                                              "capture_metadata_locations"])
+def test_help_skips_heavy_imports(entry_point_name):
+    import_timing = check_entry_point_import_time(entry_point_name)
+    assert not [x for x in HEAVY_MODULE_NAMES
+                if x in import_timing["imported_modules"]]
+    assert import_timing["forbidden_imports"] == []
+    assert import_timing["import_seconds"] < MAX_IMPORT_SECONDS
+
+
+class _FakeServiceHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        response_bytes = json.dumps(
+            {"exit_code": 0, "output": "validated\n"}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(response_bytes)))
+        self.end_headers()
+        self.wfile.write(response_bytes)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_service_client_skips_heavy_imports(tmp_path, monkeypatch):
+    # a stand-in for the service, with its token where the client (whose
+    # home directory is tmp_path) looks for it
+    fake_service = http.server.HTTPServer((DEFAULT_HOST, 0),
+                                          _FakeServiceHandler)
+    service_thread = threading.Thread(target=fake_service.serve_forever,
+                                      daemon=True)
+    service_thread.start()
+    try:
+        port = fake_service.server_address[1]
+        monkeypatch.setenv("HOME", str(tmp_path))
+        token_path = get_service_token_path(port)
+        token_path.parent.mkdir(parents=True)
+        token_path.write_text("a-token")
+
+        import_timing = check_entry_point_import_time(
+            "generate_metadata_reports",
+            ["all_samples_search_ids_20220102.csv", "--service",
+             f"http://{DEFAULT_HOST}:{port}"],
+            env=dict(os.environ))
+    finally:
+        fake_service.shutdown()
+        fake_service.server_close()
+
+    assert not [x for x in HEAVY_MODULE_NAMES
+                if x in import_timing["imported_modules"]]
+    assert import_timing["import_seconds"] < MAX_IMPORT_SECONDS
@@ -0,0 +1,71 @@
+import pathlib
+import shutil
+from datetime import datetime
+
+from src.incremental_validation import get_suite_fingerprint
+from src.metadata_validation import FULL_REPORT_FNAME_ROOT, NOT_BAD_KIND
+from tests.conftest import LOCATIONS_EXPECTATION_TYPE, REPO_DIR
+
+METADATA_FP = pathlib.Path(__file__).resolve().parent / "data" / \
+    "all_samples_search_ids_20220102.csv"
+
+
+def test_suite_fingerprint_changes_with_allowed_locations(
+        allowed_locations_fp):
+    suites_expectation_configs = [[
+        (LOCATIONS_EXPECTATION_TYPE,
+         {"column": "sample_collection_location",
+          "allowed_locations_abs_fp": str(allowed_locations_fp)})]]
+
+    suite_fingerprint = get_suite_fingerprint(suites_expectation_configs)
+    assert get_suite_fingerprint(suites_expectation_configs) == \
+        suite_fingerprint
+
+    allowed_locations_fp.write_text(
+        allowed_locations_fp.read_text().replace("      San Diego: {}\n", ""))
+    assert get_suite_fingerprint(suites_expectation_configs) != \
+        suite_fingerprint
+
+
+def test_incremental_reports_follow_allowed_locations_edit(
+        tmp_path, allowed_locations_fp, located_ge_dir, monkeypatch):
+    # the native engine finds the great_expectations directory from here
+    monkeypatch.chdir(REPO_DIR)
+    import src.generate_metadata_validation_report as reports_module
+    import src.native_validation_engine as native_engine
+
+    monkeypatch.setattr(native_engine, "_ge_dir", located_ge_dir)
+
+    # one run per second, so each run's reports get their own names
+    run_timestamps = ["2022-01-03_10-00-00", "2022-01-03_10-00-01",
+                      "2022-01-03_10-00-02"]
+    run_datetimes = iter(datetime.strptime(
+        x, reports_module.REPORT_TIMESTAMP_FORMAT) for x in run_timestamps)
+
+    class _RunDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return next(run_datetimes)
+
+    monkeypatch.setattr(reports_module, "datetime", _RunDatetime)
+
+    inspectseq_csv_path = tmp_path / METADATA_FP.name
+    shutil.copy(METADATA_FP, inspectseq_csv_path)
+    run_args = ["generate_metadata_reports", str(inspectseq_csv_path),
+                "--engine", "native"]
+    reports_module.generate_failure_and_warning_reports(
+        run_args + ["--incremental"])
+    # San Diego is no longer allowed, though no metadata row has changed
+    allowed_locations_fp.write_text(
+        allowed_locations_fp.read_text().replace("      San Diego: {}\n", ""))
+    reports_module.generate_failure_and_warning_reports(
+        run_args + ["--incremental"])
+    reports_module.generate_failure_and_warning_reports(run_args)
+
+    for curr_df_kind in ["", f"{NOT_BAD_KIND}_"]:
+        incremental_report, full_report = [
+            tmp_path / f"{inspectseq_csv_path.stem}{FULL_REPORT_FNAME_ROOT}"
+                       f"{curr_df_kind}{x}.csv"
+            for x in run_timestamps[1:]]
+        assert "San Diego" in full_report.read_text()
+        assert incremental_report.read_text() == full_report.read_text()
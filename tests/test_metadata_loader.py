@@ -0,0 +1,60 @@
+import pathlib
+import sys
+
+import pandas
+import pytest
+
+from src.metadata_loader import read_metadata_csv, read_metadata_csv_chunks
+from src.metadata_validation import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME
+
+REPO_DIR = pathlib.Path(__file__).resolve().parent.parent
+# has null cells in string, categorical, float and boolean columns
+METADATA_FP = pathlib.Path(__file__).resolve().parent / "data" / \
+    "all_samples_search_ids_20220102.csv"
+
+
+@pytest.fixture
+def suites_expectation_configs(monkeypatch):
+    # the native engine finds the great_expectations directory from here
+    monkeypatch.chdir(REPO_DIR)
+    from src.native_validation_engine import get_native_expectation_configs
+    return [get_native_expectation_configs(x) for x in
+            [DEFAULT_FAIL_EXPECT_SUITE_NAME, DEFAULT_WARN_EXPECT_SUITE_NAME]]
+
+
+def test_read_metadata_csv_same_with_and_without_pyarrow(
+        suites_expectation_configs, monkeypatch):
+    pytest.importorskip("pyarrow")
+    with_pyarrow_df = read_metadata_csv(str(METADATA_FP),
+                                        suites_expectation_configs)
+    # a None entry makes pyarrow unimportable
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    without_pyarrow_df = read_metadata_csv(str(METADATA_FP),
+                                           suites_expectation_configs)
+
+    pandas.testing.assert_frame_equal(with_pyarrow_df, without_pyarrow_df)
+    pandas.testing.assert_frame_equal(with_pyarrow_df.isna(),
+                                      without_pyarrow_df.isna())
+
+
+def test_read_metadata_csv_chunks_match_whole_file(
+        suites_expectation_configs):
+    whole_df = read_metadata_csv(str(METADATA_FP), suites_expectation_configs)
+    chunk_start = 0
+    for curr_chunk in read_metadata_csv_chunks(
+            str(METADATA_FP), suites_expectation_configs, chunksize=4):
+        whole_rows_df = whole_df.iloc[chunk_start:chunk_start + 4]
+        chunk_start += 4
+        # each chunk's categoricals have only that chunk's categories
+        pandas.testing.assert_frame_equal(curr_chunk, whole_rows_df,
+                                          check_categorical=False)
+        pandas.testing.assert_frame_equal(curr_chunk.isna(),
+                                          whole_rows_df.isna())
+    assert chunk_start >= len(whole_df)
+
+    # null string cells stay NaN rather than becoming "", "None" or "nan"
+    assert whole_df["zip"].isna().any()
+    assert not whole_df["zip"].isin(["", "None", "nan"]).any()
+    assert whole_df["submit_to_gisaid"].isna().any()
+    assert whole_df["submit_to_gisaid"].dropna().map(type).eq(bool).all()
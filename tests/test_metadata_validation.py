@@ -0,0 +1,118 @@
+import os
+
+import numpy
+import pandas
+import pytest
+
+from src.metadata_validation import FULL_REPORT_FNAME_ROOT, NOT_BAD_KIND, \
+    REPORT_MANIFEST_FNAME, _fail_values_to_strs, \
+    get_latest_validation_report, record_report_in_manifest
+
+METADATA_STEM = "all_samples_search_ids_20220102"
+
+
+def _write_report(report_dir, df_kind, timestamp):
+    if df_kind != "":
+        df_kind = df_kind + "_"
+    report_fp = report_dir / \
+        f"{METADATA_STEM}{FULL_REPORT_FNAME_ROOT}{df_kind}{timestamp}.csv"
+    report_fp.write_text("")
+    return report_fp
+
+
+def _set_mtime_ns(a_path, mtime_ns):
+    os.utime(a_path, ns=(mtime_ns, mtime_ns))
+
+
+def test_latest_report_comes_from_manifest(tmp_path):
+    first_fp = _write_report(tmp_path, "", "2022-01-03_10-00-00")
+    record_report_in_manifest(first_fp)
+    latest_fp = _write_report(tmp_path, "", "2022-01-04_10-00-00")
+    record_report_in_manifest(latest_fp)
+    not_bad_fp = _write_report(tmp_path, NOT_BAD_KIND, "2022-01-04_10-00-00")
+    record_report_in_manifest(not_bad_fp)
+
+    # a line per df kind, not per report, and the listing digest
+    manifest_path = tmp_path / REPORT_MANIFEST_FNAME
+    assert len(manifest_path.read_text().splitlines()) == 3
+    assert get_latest_validation_report(tmp_path) == latest_fp
+    assert get_latest_validation_report(tmp_path, NOT_BAD_KIND) == not_bad_fp
+    assert get_latest_validation_report(tmp_path, "other") is None
+
+
+def test_latest_report_finds_reports_copied_in(tmp_path):
+    record_report_in_manifest(
+        _write_report(tmp_path, "", "2022-01-03_10-00-00"))
+    manifest_path = tmp_path / REPORT_MANIFEST_FNAME
+
+    # copied in by hand (or written by an older version), so not recorded
+    copied_fp = _write_report(tmp_path, "", "2022-01-05_10-00-00")
+    assert get_latest_validation_report(tmp_path) == copied_fp
+    assert copied_fp.name in manifest_path.read_text()
+
+
+def test_manifest_ignores_other_files(tmp_path, monkeypatch):
+    import src.metadata_validation as validation_module
+
+    report_fp = _write_report(tmp_path, "", "2022-01-03_10-00-00")
+    record_report_in_manifest(report_fp)
+    # written by every run, but not full reports
+    for curr_fname in [report_fp.name + ".fingerprints.npy",
+                       report_fp.name + ".rows.npz",
+                       f"{METADATA_STEM}_validation_differential_report_"
+                       f"2022-01-03_10-00-00.csv",
+                       "all_samples_search_ids_20220103.csv"]:
+        (tmp_path / curr_fname).write_text("")
+
+    def _fail_rebuild(*args):
+        raise AssertionError("manifest was rebuilt")
+
+    monkeypatch.setattr(validation_module, "_find_newest_reports",
+                        _fail_rebuild)
+    assert get_latest_validation_report(tmp_path) == report_fp
+
+
+def test_latest_report_tie_survives_rebuild(tmp_path):
+    # two batch files validated within the same second
+    first_fp, second_fp = [
+        tmp_path / f"all_samples_search_ids_2022010{x}{FULL_REPORT_FNAME_ROOT}"
+                   f"2022-01-03_10-00-00.csv" for x in [3, 2]]
+    first_fp.write_text("")
+    record_report_in_manifest(first_fp)
+    second_fp.write_text("")
+    _set_mtime_ns(second_fp, first_fp.stat().st_mtime_ns + 10 ** 9)
+    record_report_in_manifest(second_fp)
+    assert get_latest_validation_report(tmp_path) == second_fp
+
+    # an unrelated report forces a rebuild, which must agree
+    _write_report(tmp_path, NOT_BAD_KIND, "2022-01-03_10-00-00")
+    assert get_latest_validation_report(tmp_path) == second_fp
+    (tmp_path / REPORT_MANIFEST_FNAME).unlink()
+    assert get_latest_validation_report(tmp_path) == second_fp
+
+
+def test_latest_report_reads_older_manifest(tmp_path):
+    # an older version's manifest lists every report, in recorded order
+    report_fps = [_write_report(tmp_path, "", x) for x in
+                  ["2022-01-04_10-00-00", "2022-01-03_10-00-00"]]
+    manifest_path = tmp_path / REPORT_MANIFEST_FNAME
+    manifest_path.write_text("".join(
+        f"\t{x.name.split(FULL_REPORT_FNAME_ROOT)[1][:-4]}\t{x.name}\n"
+        for x in report_fps))
+
+    assert get_latest_validation_report(tmp_path) == report_fps[0]
+
+
+@pytest.mark.parametrize("fail_values", [
+    # an object column of the kinds of values the checks report
+    [pandas.Timestamp("2021-03-03 10:00:00+00:00"), True, False, 2000.0,
+     0.5, 1 / 3, 1e20, 3, None, float("nan"), pandas.NaT, pandas.NA,
+     "SEARCH-1", numpy.float64(1.0), numpy.int64(5), numpy.bool_(True)],
+    # all numbers, as from the age range check
+    [2000.0, 0.5, -6.0, float("nan")],
+    [True, False, None],
+    ["SEARCH-1", "9212"],
+])
+def test_fail_values_to_strs_matches_str(fail_values):
+    assert list(_fail_values_to_strs(fail_values)) == \
+        [str(x) for x in fail_values]
@@ -0,0 +1,59 @@
+import pathlib
+
+import pandas
+import pytest
+
+from src.metadata_loader import read_metadata_csv
+from src.metadata_validation import DEFAULT_FAIL_EXPECT_SUITE_NAME, \
+    DEFAULT_WARN_EXPECT_SUITE_NAME, concat_fail_dfs, \
+    generate_result_fail_dfs, load_data_context
+from tests.conftest import LOCATIONS_EXPECTATION_TYPE
+
+# has nulls (including a row with null zip, location and datetime), a
+# row_condition hit (a missing state_code with a zip), values for the
+# type-list checks, datetimes that fail the regex or the date bounds,
+# allowed and disallowed locations, and a duplicated search_id
+METADATA_FP = pathlib.Path(__file__).resolve().parent / "data" / \
+    "all_samples_search_ids_20220102.csv"
+SUITE_NAMES_AND_TYPES = [(DEFAULT_FAIL_EXPECT_SUITE_NAME, "failure"),
+                         (DEFAULT_WARN_EXPECT_SUITE_NAME, "warning")]
+
+
+@pytest.mark.parametrize("keep_expectation_type", [None, lambda x: True],
+                         ids=["checkpoint", "validator"])
+@pytest.mark.parametrize("suite_name, suite_type", SUITE_NAMES_AND_TYPES)
+def test_native_fail_dfs_match_ge(suite_name, suite_type,
+                                  keep_expectation_type, tmp_path,
+                                  located_ge_dir, monkeypatch):
+    # not just "great_expectations": this repo's great_expectations
+    # directory imports as a namespace package when GE isn't installed
+    pytest.importorskip("great_expectations.data_context")
+    import src.native_validation_engine as native_engine
+
+    # the DataContext finds the located great_expectations directory from
+    # here, and the native engine is pointed at it
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(native_engine, "_ge_dir", located_ge_dir)
+
+    context = load_data_context()
+    inspectseq_df = read_metadata_csv(
+        str(METADATA_FP),
+        [native_engine.get_native_expectation_configs(x)
+         for x, _ in SUITE_NAMES_AND_TYPES])
+
+    ge_fail_dfs, ge_expectation_types = generate_result_fail_dfs(
+        context, suite_name, suite_type, "native_parity_test", inspectseq_df,
+        keep_expectation_type=keep_expectation_type)
+    native_fail_dfs, native_expectation_types = \
+        native_engine.generate_native_result_fail_dfs(suite_name, suite_type,
+                                                      inspectseq_df)
+
+    assert native_expectation_types == ge_expectation_types
+    pandas.testing.assert_frame_equal(concat_fail_dfs(native_fail_dfs),
+                                      concat_fail_dfs(ge_fail_dfs))
+    # the location check ran, rather than erroring on the shipped suite's
+    # placeholder path as both engines would, and so was compared too
+    for curr_fail_df, curr_type in zip(native_fail_dfs,
+                                       native_expectation_types):
+        if curr_type == LOCATIONS_EXPECTATION_TYPE:
+            assert curr_fail_df is not None
@@ -0,0 +1,45 @@
+import http.server
+import json
+import threading
+
+import pytest
+
+from src.validation_service_client import DEFAULT_HOST, JSON_CONTENT_TYPE, \
+    get_service_token_path, submit_validation_job
+
+
+class _RefusingServiceHandler(http.server.BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        response_bytes = json.dumps(
+            {"error": "missing or wrong service token"}).encode("utf-8")
+        self.send_response(403)
+        self.send_header("Content-Type", JSON_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(response_bytes)))
+        self.end_headers()
+        self.wfile.write(response_bytes)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_rejected_job_reports_service_error(tmp_path, monkeypatch):
+    refusing_service = http.server.HTTPServer((DEFAULT_HOST, 0),
+                                              _RefusingServiceHandler)
+    threading.Thread(target=refusing_service.serve_forever,
+                     daemon=True).start()
+    try:
+        port = refusing_service.server_address[1]
+        monkeypatch.setenv("HOME", str(tmp_path))
+        token_path = get_service_token_path(port)
+        token_path.parent.mkdir(parents=True)
+        token_path.write_text("a-stale-token")
+
+        # the service responded, so this isn't a ConnectionError
+        with pytest.raises(RuntimeError,
+                           match="403.*missing or wrong service token"):
+            submit_validation_job(f"http://{DEFAULT_HOST}:{port}",
+                                  ["all_samples_search_ids_20220102.csv"])
+    finally:
+        refusing_service.shutdown()
+        refusing_service.server_close()